@@ -148,7 +148,7 @@ class EnhancedTelegramBot(SessionCommands, HelpCommandMixin):
         # Session management commands
         self.bot_app.add_handler(CommandHandler("session", self._session_command))
         self.bot_app.add_handler(MessageHandler(filters.Document.ALL & ~filters.COMMAND, self._session_command))
-        self.bot_app.add_handler(CallbackQueryHandler(self.handle_session_button))
+        self.bot_app.add_handler(CallbackQueryHandler(self.session_commands.handle_session_button))
         
         # Add conversation handler for authentication
         auth_handler = ConversationHandler(
@@ -189,6 +189,7 @@ class EnhancedTelegramBot(SessionCommands, HelpCommandMixin):
     async def shutdown(self):
     # Graceful shutdown of bot and services
         try:
+            self.session_commands.cancel_session_cleanup()
             await self.services.stop_all()
             await self.bot_app.stop()
             await self.bot_app.shutdown()
@@ -201,6 +202,7 @@ class EnhancedTelegramBot(SessionCommands, HelpCommandMixin):
         cleanup_service = self.services.get(CleanupService)
         if cleanup_service:
             cleanup_service.schedule_cleanup(scheduler=self.bot_app)
+        self.session_commands.schedule_session_cleanup()
             
     async def _start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         # Handle /start command
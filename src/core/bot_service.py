@@ -30,7 +30,11 @@ class BotService(BaseService):
         """Initialize bot service with configuration."""
         super().__init__()
         self.config = config
-        self.service_manager = ServiceManager()
+        self.service_manager = ServiceManager(startup_levels=[
+            ['database'],
+            ['session_storage'],
+            ['instagram', 'uploader']
+        ])
         self.url_service = URLDetectionService()
         self._cache: Dict[str, Any] = {}
         
@@ -65,12 +69,7 @@ class BotService(BaseService):
             
         try:
             # Initialize core services first
-            await self.service_manager.initialize_all([
-                'database',
-                'session_storage',
-                'instagram',
-                'uploader'
-            ])
+            await self.service_manager.initialize_all()
             
             self._initialized = True
             logger.info("Bot services initialized successfully")
@@ -39,6 +39,8 @@ class RateLimitConfig:
 
     def load_config(self):
         """Load configuration from file."""
+        # Start from defaults so keys missing from the file still resolve
+        self._set_defaults()
         try:
             with open(self.config_path, 'r') as f:
                 config = {}
@@ -46,6 +48,7 @@ class RateLimitConfig:
                     line = line.strip()
                     if line and not line.startswith('#'):
                         key, value = [x.strip() for x in line.split('=', 1)]
+                        value = value.split('#')[0]  # Remove inline comments
                         config[key] = self._convert_value(value)
                 
                 self.__dict__.update(config)
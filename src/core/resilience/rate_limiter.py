@@ -18,6 +18,20 @@ class InstagramRateLimiter:
         self.config = RateLimitConfig(
             config_path or Path('config/rate_limiting.conf')
         )
+        # Bind hot-path settings once so wait_for_request avoids config lookups
+        self._min_interval = float(self.config.INSTAGRAM_MIN_REQUEST_INTERVAL)
+        self._batch_delay = float(self.config.INSTAGRAM_BATCH_DELAY)
+        self._max_burst = self.config.INSTAGRAM_MAX_BURST_REQUESTS
+        self._burst_floor = self._min_interval * 1.1
+        self._type_floors = {
+            'normal': self._min_interval,
+            'batch': max(self._min_interval, self._batch_delay),
+        }
+        # Conservative mode doubles the interval before the batch floor applies
+        self._conservative_floors = {
+            'normal': self._min_interval * 2,
+            'batch': max(self._min_interval * 2, self._batch_delay),
+        }
         self.last_request_time = 0.0
         self.request_count = 0
         self.error_count = 0
@@ -74,36 +88,27 @@ class InstagramRateLimiter:
         # Check and potentially exit conservative mode
         self.exit_conservative_mode()
         
-        # Calculate base delay
-        time_since_last = current_time - self.last_request_time
-        base_delay = max(0, self.config.INSTAGRAM_MIN_REQUEST_INTERVAL - time_since_last)
-        
-        # Always ensure at least minimum interval
-        base_delay = max(base_delay, self.config.INSTAGRAM_MIN_REQUEST_INTERVAL)
-        
-        # Adjust delay based on conditions
-        if self.in_conservative_mode:
-            base_delay *= 2  # Double the delay in conservative mode
-            
-        if request_type == 'batch':
-            base_delay = max(base_delay, self.config.INSTAGRAM_BATCH_DELAY)
+        # Base delay is the per-type floor; conservative mode doubles the interval
+        floors = self._conservative_floors if self.in_conservative_mode else self._type_floors
+        base_delay = floors.get(request_type, floors['normal'])
         
         # Check recent request count and add cumulative delay for bursts
         recent_requests = len([ts for ts in self.request_history if ts >= current_time - 10])
         burst_count = recent_requests + 1  # Include current request
         
         # Enforce minimum delay between operations proportional to burst count
-        if burst_count > self.config.INSTAGRAM_MAX_BURST_REQUESTS:
+        max_burst = self._max_burst
+        if burst_count > max_burst:
             # Base multiplier starts at 1.2 for being over burst limit
             multiplier = 1.2
             # Add 0.1 for each request over burst limit
-            multiplier += 0.1 * (burst_count - self.config.INSTAGRAM_MAX_BURST_REQUESTS)
+            multiplier += 0.1 * (burst_count - max_burst)
             
             # Ensure the base delay is at least 10% higher than normal
-            base_delay = max(base_delay * multiplier, self.config.INSTAGRAM_MIN_REQUEST_INTERVAL * 1.1)
+            base_delay = max(base_delay * multiplier, self._burst_floor)
             
             # If we're way over burst limits, add additional delay
-            if burst_count >= self.config.INSTAGRAM_MAX_BURST_REQUESTS * 2:
+            if burst_count >= max_burst * 2:
                 base_delay *= 1.5
         
         # Add jitter for more natural timing
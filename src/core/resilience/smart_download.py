@@ -1,130 +1,208 @@
 """Integrated rate limiting and smart backoff for Instagram downloads."""
 import asyncio
 import logging
+import re
 import time
 import random
-from typing import Any, Callable, TypeVar, Optional
+from collections import deque
+from typing import Any, Callable, NamedTuple, TypeVar, Optional
 from functools import wraps
-from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 
-class InstagramRateLimit:
+# Pre-bound hot-path callables for the retry and pacing loops
+_sleep = asyncio.sleep
+_uniform = random.uniform
+_monotonic = time.monotonic
+
+# Error classifiers, compiled once so each failure message is scanned in C
+_RATE_LIMIT_RE = re.compile(r"rate[ _-]?limit|too many requests|\b429\b", re.IGNORECASE)
+_BLOCKED_RE = re.compile(r"blocked|suspicious|unusual activity", re.IGNORECASE)
+
+class _RateLimitSettings(NamedTuple):
     """Configuration constants for Instagram rate limiting"""
-    REQUESTS_PER_HOUR = 100
-    MIN_REQUEST_INTERVAL = 6.0
-    BATCH_DELAY = 30.0
-    BACKOFF_INITIAL = 10.0
-    BACKOFF_MAX = 1800.0  # 30 minutes
-    BACKOFF_MULTIPLIER = 2.0
-    BACKOFF_JITTER = 0.1
-    SESSION_MAX_REQUESTS = 50
-    SESSION_ROTATE_INTERVAL = 3600  # 1 hour
+    requests_per_hour: int = 100
+    min_request_interval: float = 6.0
+    batch_delay: float = 30.0
+    backoff_initial: float = 10.0
+    backoff_max: float = 1800.0  # 30 minutes
+    backoff_multiplier: float = 2.0
+    backoff_jitter: float = 0.1
+    session_max_requests: int = 50
+    session_rotate_interval: float = 3600  # 1 hour
+
+# Immutable snapshot; hot paths bind it to a local (IRL) for cheap field access
+InstagramRateLimit = _RateLimitSettings()
 
 class SmartDownloadManager:
     """Manages download operations with rate limiting and backoff"""
     
     def __init__(self):
-        self.last_request_time = 0.0
         self.request_count = 0
         self.error_count = 0
-        self.session_start_time = datetime.now()
+        self.session_start_time = _monotonic()
         self.session_request_count = 0
         self.in_conservative_mode = False
-        self._request_history = {}
+        # Planned start times of the last requests_per_hour requests
+        self._request_history: deque = deque(maxlen=InstagramRateLimit.requests_per_hour)
+        # Token bucket: bursts up to capacity, refilled at the min-interval rate
+        self._capacity = InstagramRateLimit.session_max_requests // 10
+        self._refill_rate = 1.0 / InstagramRateLimit.min_request_interval
+        self._tokens = float(self._capacity)
+        self._last_refill = _monotonic()
+        # Previous backoff, seed for decorrelated jitter
+        self._prev_backoff = InstagramRateLimit.backoff_initial
         
     def _add_jitter(self, delay: float) -> float:
         """Add random jitter to delay"""
-        jitter = delay * InstagramRateLimit.BACKOFF_JITTER
-        return delay + random.uniform(-jitter, jitter)
-        
-    def _calculate_backoff(self, attempt: int) -> float:
-        """Calculate backoff time with jitter"""
-        delay = min(
-            InstagramRateLimit.BACKOFF_INITIAL * 
-            (InstagramRateLimit.BACKOFF_MULTIPLIER ** attempt),
-            InstagramRateLimit.BACKOFF_MAX
+        jitter = delay * InstagramRateLimit.backoff_jitter
+        return delay + _uniform(-jitter, jitter)
+        
+    def _calculate_backoff(self) -> float:
+        """Calculate backoff time using decorrelated jitter.
+        
+        Each wait is drawn from [initial, 3 * previous wait] and capped, so
+        workers failing together spread their retries instead of stampeding.
+        """
+        IRL = InstagramRateLimit
+        self._prev_backoff = min(
+            IRL.backoff_max,
+            _uniform(IRL.backoff_initial, self._prev_backoff * 3)
         )
-        return self._add_jitter(delay)
+        return self._prev_backoff
+        
+    def reset_backoff(self) -> None:
+        """Reset the backoff sequence after a successful request"""
+        self._prev_backoff = InstagramRateLimit.backoff_initial
         
     def should_rotate_session(self) -> bool:
         """Check if we should rotate the session"""
-        session_age = datetime.now() - self.session_start_time
+        IRL = InstagramRateLimit
         return (
-            session_age.total_seconds() >= InstagramRateLimit.SESSION_ROTATE_INTERVAL or
-            self.session_request_count >= InstagramRateLimit.SESSION_MAX_REQUESTS
+            _monotonic() - self.session_start_time >= IRL.session_rotate_interval or
+            self.session_request_count >= IRL.session_max_requests
         )
         
     async def wait_before_request(self, is_batch: bool = False) -> None:
-        """Smart wait before making a request"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
+        """Smart wait before making a request.
         
-        # Base delay calculation
-        base_delay = max(0, InstagramRateLimit.MIN_REQUEST_INTERVAL - time_since_last)
+        Takes a token from the bucket without suspending when one is
+        available. Otherwise the token is reserved up front, letting the
+        balance go negative, so concurrent waiters queue one refill
+        interval apart instead of all waking together.
+        
+        Conservative mode costs two tokens per request and allows no
+        burst, doubling the spacing from the first request on. Batch
+        requests always wait at least batch_delay.
+        """
+        # Conservative mode: no burst beyond one request, at twice the interval
+        cost = 2.0 if self.in_conservative_mode else 1.0
+        capacity = cost if self.in_conservative_mode else self._capacity
+        
+        now = _monotonic()
+        self._tokens = min(
+            capacity,
+            self._tokens + (now - self._last_refill) * self._refill_rate
+        )
+        self._last_refill = now
+        self._tokens -= cost
+        
+        # Time until the reserved tokens are refilled
+        delay = max(0.0, -self._tokens / self._refill_rate)
         
         # Additional delay for batch operations
         if is_batch:
-            base_delay = max(base_delay, InstagramRateLimit.BATCH_DELAY)
-            
-        # Extra delay in conservative mode
-        if self.in_conservative_mode:
-            base_delay *= 2
+            delay = max(delay, InstagramRateLimit.batch_delay)
             
-        # Add jitter and wait
-        delay = self._add_jitter(base_delay)
         if delay > 0:
-            await asyncio.sleep(delay)
+            delay = self._add_jitter(delay)
+        
+        # Hourly cap: once the window is full, start no sooner than an hour
+        # after the oldest request in it. The planned start is recorded before
+        # sleeping so concurrent callers queue behind each other.
+        history = self._request_history
+        if len(history) == history.maxlen:
+            delay = max(delay, history[0] + 3600.0 - now)
+        history.append(now + delay)
+        
+        if delay > 0:
+            await _sleep(delay)
             
         # Update tracking
-        self.last_request_time = time.time()
         self.request_count += 1
         self.session_request_count += 1
         
+    def get_hourly_request_count(self) -> int:
+        """Get number of requests made in the last hour"""
+        history = self._request_history
+        window_start = _monotonic() - 3600.0
+        while history and history[0] < window_start:
+            history.popleft()
+        return len(history)
+        
+    def can_make_request(self) -> bool:
+        """Check if the hourly request cap still has room"""
+        return self.get_hourly_request_count() < InstagramRateLimit.requests_per_hour
+        
     def handle_error(self, error: Exception) -> float:
         """Handle error and return backoff time"""
         self.error_count += 1
         
         # Analyze error type
-        error_str = str(error).lower()
-        if any(phrase in error_str for phrase in [
-            "rate limit", "too many requests", "429"
-        ]):
+        error_str = str(error)
+        if _RATE_LIMIT_RE.search(error_str):
             self.in_conservative_mode = True
-            return self._calculate_backoff(self.error_count)
             
-        elif any(phrase in error_str for phrase in [
-            "blocked", "suspicious", "unusual activity"
-        ]):
+        elif _BLOCKED_RE.search(error_str):
             self.in_conservative_mode = True
-            return InstagramRateLimit.BACKOFF_MAX
+            return InstagramRateLimit.backoff_max
             
-        return self._calculate_backoff(min(self.error_count, 3))
+        return self._calculate_backoff()
+
+class DownloadManagerDescriptor:
+    """Lazily attaches a SmartDownloadManager to each instance on first access.
+    
+    Declare as ``_download_manager = DownloadManagerDescriptor()`` on classes
+    using @with_smart_download. An instance attribute set explicitly takes
+    precedence, since this is a non-data descriptor.
+    """
+    
+    def __get__(self, obj: Any, objtype: Optional[type] = None) -> Any:
+        if obj is None:
+            return self
+        manager = SmartDownloadManager()
+        obj.__dict__['_download_manager'] = manager
+        return manager
 
 def with_smart_download(batch: bool = False, max_retries: int = 3):
-    """Decorator for smart download handling with retries."""
+    """Decorator for smart download handling with retries.
+    
+    The decorated method's class must provide ``_download_manager``, either
+    via DownloadManagerDescriptor or by assigning it in ``__init__``.
+    """
     def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
         @wraps(func)
         async def wrapper(self, *args: Any, **kwargs: Any) -> Any:
-            if not hasattr(self, '_download_manager'):
-                self._download_manager = SmartDownloadManager()
-                
+            manager = self._download_manager
+            
             for attempt in range(max_retries):
                 # Check session rotation
-                if self._download_manager.should_rotate_session():
+                if manager.should_rotate_session():
                     await self.refresh_session()
-                    self._download_manager.session_start_time = datetime.now()
-                    self._download_manager.session_request_count = 0
+                    manager.session_start_time = _monotonic()
+                    manager.session_request_count = 0
                     
                 # Wait before request
-                await self._download_manager.wait_before_request(batch)
+                await manager.wait_before_request(batch)
                 
                 try:
-                    return await func(self, *args, **kwargs)
+                    result = await func(self, *args, **kwargs)
+                    manager.reset_backoff()
+                    return result
                 except Exception as e:
-                    backoff_time = self._download_manager.handle_error(e)
+                    backoff_time = manager.handle_error(e)
                     if attempt == max_retries - 1:  # Last attempt
                         logger.error(f"All {max_retries} attempts failed: {str(e)}")
                         raise
@@ -132,7 +210,7 @@ def with_smart_download(batch: bool = False, max_retries: int = 3):
                         f"Download failed (attempt {attempt + 1}/{max_retries}), "
                         f"backing off for {backoff_time:.1f}s: {str(e)}"
                     )
-                    await asyncio.sleep(backoff_time)
+                    await _sleep(backoff_time)
             
             raise RuntimeError("Should not reach here")
                 
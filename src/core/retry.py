@@ -1,10 +1,15 @@
 import asyncio
 import logging
+import random
 from functools import wraps
 from typing import Type, Union, Optional, List, Callable, Any
 
 logger = logging.getLogger(__name__)
 
+# Pre-bound hot-path callables for the retry loops
+_sleep = asyncio.sleep
+_uniform = random.uniform
+
 def with_retry(max_retries: int = 3):
     """Decorator for retrying operations with exponential backoff."""
     def decorator(func):
@@ -17,9 +22,9 @@ def with_retry(max_retries: int = 3):
                     if attempt == max_retries - 1:
                         logger.error(f"Max retries ({max_retries}) exceeded", exc_info=True)
                         raise
-                    wait_time = (2 ** attempt) + (asyncio.get_event_loop().time() % 1)
+                    wait_time = (2 ** attempt) + _uniform(0, 1)
                     logger.warning(f"Retry {attempt + 1}/{max_retries} after {wait_time:.1f}s: {str(e)}")
-                    await asyncio.sleep(wait_time)
+                    await _sleep(wait_time)
             return None
         return wrapper
     return decorator
@@ -49,52 +54,61 @@ class RetryableOperation:
         self.max_retries = max_retries
         self.backoff_factor = backoff_factor
         self.exceptions = exceptions or [Exception]
+        self._exc_tuple = tuple(self.exceptions)
         self.should_retry = should_retry
         self.on_retry = on_retry
     
     def __call__(self, func):
+        # Settings are fixed at decoration time; capture them in the closure
+        # so the retry loop reads cells instead of attributes
+        max_retries = self.max_retries
+        backoff_factor = self.backoff_factor
+        exc_tuple = self._exc_tuple
+        should_retry = self.should_retry
+        on_retry = self.on_retry
+        
         @wraps(func)
         async def wrapper(*args, **kwargs):
             last_exception = None
+            # Seed for decorrelated jitter; each call starts a fresh sequence
+            prev_delay = backoff_factor
             
-            for attempt in range(self.max_retries):
+            for attempt in range(max_retries):
                 try:
                     return await func(*args, **kwargs)
-                except tuple(self.exceptions) as e:
+                except exc_tuple as e:
                     last_exception = e
                     
                     # Check if we should retry this error
-                    if self.should_retry and not self.should_retry(e):
+                    if should_retry and not should_retry(e):
                         raise
                     
                     # Last attempt - don't wait, just raise
-                    if attempt == self.max_retries - 1:
+                    if attempt == max_retries - 1:
                         raise MaxRetriesExceeded(
-                            f"Operation failed after {self.max_retries} attempts"
+                            f"Operation failed after {max_retries} attempts"
                         ) from last_exception
                     
-                    # Calculate delay with exponential backoff
-                    delay = (2 ** attempt) * self.backoff_factor
-                    
-                    # Add some jitter to prevent thundering herd
-                    jitter = delay * 0.1
-                    delay += asyncio.get_running_loop().time() % jitter
+                    # Decorrelated jitter: spread retries over [base, 3 * previous]
+                    # to prevent thundering herd
+                    delay = min(30.0, _uniform(backoff_factor, prev_delay * 3))
+                    prev_delay = delay
                     
                     logger.warning(
-                        f"Operation failed (attempt {attempt + 1}/{self.max_retries}), "
+                        f"Operation failed (attempt {attempt + 1}/{max_retries}), "
                         f"retrying in {delay:.1f}s",
                         exc_info=last_exception
                     )
                     
                     # Call the retry callback if provided
-                    if self.on_retry:
-                        await self.on_retry(attempt, last_exception)
+                    if on_retry:
+                        await on_retry(attempt, last_exception)
                     
-                    await asyncio.sleep(delay)
+                    await _sleep(delay)
             
             # This shouldn't be reached, but just in case
             raise MaxRetriesExceeded(
-                f"Operation failed after {self.max_retries} attempts"
+                f"Operation failed after {max_retries} attempts"
             ) from last_exception
         
         return wrapper
@@ -15,9 +15,16 @@ class CommandRouter:
         await router.route_command(update, context)
     """
     
+    UNKNOWN_COMMAND_REPLY = "❓ Unknown command. Use /help to see available commands."
+    ERROR_REPLY_TEMPLATE = (
+        "❌ Error executing command: `{message}`\n\n"
+        "Please try again or check logs for details."
+    )
+    
     def __init__(self, services: "BotServices"):
         self.services = services
         self.commands: Dict[str, Callable] = {}
+        self._get_handler = self.commands.get
         self._setup_default_error_handler()
     
     def register_command(self, command: str, handler: Callable):
@@ -33,8 +40,13 @@ class CommandRouter:
         if not update.message or not update.message.text:
             return
             
-        command = update.message.text.split()[0][1:]  # Remove /
-        handler = self.commands.get(command)
+        # Only the first token matters; don't split the whole caption
+        head = update.message.text.split(maxsplit=1)
+        if not head or head[0][0] != '/':
+            return
+            
+        command = head[0][1:]  # Remove /
+        handler = self._get_handler(command)
         
         if not handler:
             await self._handle_unknown_command(update, context)
@@ -48,7 +60,7 @@ class CommandRouter:
     async def _handle_unknown_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle unknown commands"""
         await update.message.reply_text(
-            "❓ Unknown command. Use /help to see available commands.",
+            self.UNKNOWN_COMMAND_REPLY,
             parse_mode='Markdown'
         )
     
@@ -65,8 +77,7 @@ class CommandRouter:
             error_message = error_message[:97] + "..."
             
         await update.message.reply_text(
-            f"❌ Error executing command: `{error_message}`\n\n"
-            "Please try again or check logs for details.",
+            self.ERROR_REPLY_TEMPLATE.format(message=error_message),
             parse_mode='Markdown'
         )
         logger.error(
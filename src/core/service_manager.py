@@ -2,7 +2,7 @@
 
 import asyncio
 import logging
-from typing import Dict, Type
+from typing import Dict, List, Optional, Type
 from src.core.base_service import BaseService
 from src.core.exceptions import ConfigurationError
 
@@ -11,17 +11,30 @@ logger = logging.getLogger(__name__)
 class ServiceManager:
     """Manages initialization and cleanup of bot services."""
     
-    def __init__(self):
-        """Initialize the service manager."""
+    DEFAULT_STARTUP_LEVELS: List[List[str]] = [
+        ['database'],
+        ['session_storage'],
+        ['telegram', 'instagram', 'uploader']
+    ]
+    
+    def __init__(self, startup_levels: Optional[List[List[str]]] = None):
+        """
+        Initialize the service manager.
+        
+        Args:
+            startup_levels: Required services grouped by dependency level.
+                Services within a level do not depend on each other and
+                start concurrently. Defaults to DEFAULT_STARTUP_LEVELS.
+        """
         self._services: Dict[str, BaseService] = {}
         self._initialized = False
-        self._startup_order = [
-            'database',
-            'session_storage',
-            'telegram',
-            'instagram',
-            'uploader'
+        self._startup_levels = [
+            list(level) for level in (startup_levels or self.DEFAULT_STARTUP_LEVELS)
         ]
+        self._startup_order = [name for level in self._startup_levels for name in level]
+        self._startup_set = frozenset(self._startup_order)
+        # Required services not yet registered; emptied by register()
+        self._pending_required = set(self._startup_order)
     
     def register(self, name: str, service: BaseService) -> None:
         """
@@ -37,13 +50,15 @@ class ServiceManager:
         if name in self._services:
             raise ConfigurationError(f"Service {name} already registered")
         self._services[name] = service
+        self._pending_required.discard(name)
     
     async def initialize_all(self) -> None:
         """
         Initialize all services in predefined order.
         
-        The initialization order is defined by self._startup_order.
-        Services not in the startup order are initialized last.
+        The initialization order is defined by self._startup_levels; services
+        in the same level are initialized concurrently. Services not in the
+        startup order are initialized last, in the order they were registered.
         
         Raises:
             ConfigurationError: If a required service is missing
@@ -52,49 +67,67 @@ class ServiceManager:
             return
             
         # Validate required services
-        missing = [name for name in self._startup_order 
-                  if name not in self._services]
-        if missing:
+        if self._pending_required:
+            missing = [name for name in self._startup_order if name in self._pending_required]
             raise ConfigurationError(f"Required services missing: {', '.join(missing)}")
             
-        # Initialize ordered services first
-        for name in self._startup_order:
-            if name in self._services:
-                await self._initialize_service(name)
+        # Initialize ordered services first, one level at a time
+        for level in self._startup_levels:
+            await asyncio.gather(*(
+                self._initialize_service(name)
+                for name in level if name in self._services
+            ))
         
-        # Initialize any remaining services
-        remaining = set(self._services.keys()) - set(self._startup_order)
-        for name in remaining:
-            await self._initialize_service(name)
+        # Initialize any remaining services in registration order
+        for name in self._services:
+            if name not in self._startup_set:
+                await self._initialize_service(name)
         
         self._initialized = True
     
     async def _initialize_service(self, name: str) -> None:
-        """Initialize a single service by name."""
         """Initialize a single service with error handling."""
         service = self._services[name]
         try:
-            logger.info(f"Initializing service: {name}")
+            logger.info("Initializing service: %s", name)
             await service.initialize()
-            logger.info(f"Service initialized: {name}")
+            logger.info("Service initialized: %s", name)
         except Exception as e:
-            logger.error(f"Failed to initialize service {name}: {e}")
+            logger.error("Failed to initialize service %s: %s", name, e)
             raise
     
     async def shutdown_all(self) -> None:
-        """Shutdown all services in reverse initialization order."""
+        """Shutdown all services in reverse initialization order.
+        
+        Services in the same startup level are shut down concurrently; a
+        failing shutdown is logged and does not block the others.
+        """
         if not self._initialized:
             return
             
-        # Shutdown in reverse order
-        for name in reversed(list(self._services.keys())):
-            service = self._services[name]
-            try:
-                logger.info(f"Shutting down service: {name}")
-                await service.shutdown()
-                logger.info(f"Service shut down: {name}")
-            except Exception as e:
-                logger.error(f"Error shutting down service {name}: {e}")
+        services = self._services
+        startup_set = self._startup_set
+        
+        # Services outside the startup order came up last, so they go down first
+        for name in reversed(services):
+            if name not in startup_set:
+                await self._shutdown_service(name)
+            
+        for level in reversed(self._startup_levels):
+            await asyncio.gather(
+                *(self._shutdown_service(name) for name in level if name in services),
+                return_exceptions=True
+            )
+    
+    async def _shutdown_service(self, name: str) -> None:
+        """Shutdown a single service, logging rather than raising errors."""
+        service = self._services[name]
+        try:
+            logger.info("Shutting down service: %s", name)
+            await service.shutdown()
+            logger.info("Service shut down: %s", name)
+        except Exception as e:
+            logger.error("Error shutting down service %s: %s", name, e)
     
     def get_service(self, name: str) -> BaseService:
         """Get a registered service by name."""
@@ -1,9 +1,13 @@
+import asyncio
 import logging
 from dataclasses import dataclass
-from typing import Optional
+from typing import ClassVar, Dict, Optional
 from .config import BotConfig
 from typing import TYPE_CHECKING
 
+if TYPE_CHECKING:
+    import requests
+
 # Import service types
 from src.services.bot_api_uploader import BotAPIUploader
 from src.services.telethon_uploader import TelethonUploader
@@ -28,6 +32,18 @@ class BotServices:
     rate_limiter: Optional["InstagramRateLimiter"] = None
     session_storage: Optional["SessionStorageService"] = None
     cleanup_service: Optional["CleanupService"] = None
+    http_session: Optional["requests.Session"] = None  # Keep-alive pool for session probes
+    
+    # Maps a service type to the attribute holding its instance
+    _TYPE_ATTR: ClassVar[Dict[type, str]] = {
+        CleanupService: 'cleanup_service',
+        DatabaseService: 'database_service',
+        InstagramDownloader: 'instagram_service',
+        BotAPIUploader: 'bot_api_uploader',
+        TelethonUploader: 'telethon_uploader',
+        ProgressTracker: 'progress_tracker',
+        SessionStorageService: 'session_storage',
+    }
     
     @classmethod
     def create(cls, config: BotConfig) -> "BotServices":
@@ -58,6 +74,13 @@ class BotServices:
         services.instagram_service.rate_limiter = services.rate_limiter  # Set after construction
         services.instagram_service.session_storage = services.session_storage  # Set after construction
         
+        # Keep-alive pool for the session manager's validation probes;
+        # downloads themselves run in the gallery-dl subprocess
+        session_manager = services.instagram_service.session_manager
+        if session_manager:
+            services.http_session = session_manager.create_http_session()
+            session_manager.http = services.http_session
+        
         # Create upload services based on file size limits
         from src.services.bot_api_uploader import BotAPIUploader
         from src.services.telethon_uploader import TelethonUploader
@@ -86,21 +109,8 @@ class BotServices:
     
     def get(self, service_type):
         """Get a service by its type."""
-        if service_type == CleanupService:
-            return self.cleanup_service
-        elif service_type == DatabaseService:
-            return self.database_service
-        elif service_type == InstagramDownloader:
-            return self.instagram_service
-        elif service_type == BotAPIUploader:
-            return self.bot_api_uploader
-        elif service_type == TelethonUploader:
-            return self.telethon_uploader
-        elif service_type == ProgressTracker:
-            return self.progress_tracker
-        elif service_type == SessionStorageService:
-            return self.session_storage
-        return None
+        attr = self._TYPE_ATTR.get(service_type)
+        return getattr(self, attr) if attr else None
     
     async def start_all(self):
         """Start all services."""
@@ -119,17 +129,13 @@ class BotServices:
             if self.database_service:
                 await self.database_service.initialize()
             
-            # Initialize session storage next
-            if self.session_storage:
-                await self.session_storage.initialize()
-            
-            # Initialize rate limiter
-            if self.rate_limiter:
-                await self.rate_limiter.initialize()
-            
-            # Initialize progress tracker
-            if self.progress_tracker:
-                await self.progress_tracker.initialize()
+            # Session storage, rate limiter and progress tracker only need the
+            # database, so bring them up concurrently
+            await asyncio.gather(*(
+                service.initialize()
+                for service in (self.session_storage, self.rate_limiter, self.progress_tracker)
+                if service
+            ))
             
             # Initialize services that depend on others
             if self.instagram_service:
@@ -150,22 +156,33 @@ class BotServices:
     
     async def cleanup(self):
         """Cleanup all services in reverse initialization order"""
-        logger = logging.getLogger(__name__)
+        # These hold no resources the others depend on, so clean them up concurrently
+        independent = (self.cleanup_service, self.progress_tracker, self.rate_limiter)
+        await asyncio.gather(
+            *(self._cleanup_service(service) for service in independent if service),
+            return_exceptions=True
+        )
         
-        # Cleanup in reverse order of initialization
-        services = [
-            self.cleanup_service,
+        # The rest in reverse dependency order
+        ordered = [
             self.file_service,
             self.instagram_service,
-            self.progress_tracker,
-            self.rate_limiter,
             self.session_storage,
             self.database_service
         ]
         
-        for service in services:
+        for service in ordered:
             if service:
-                try:
-                    await service.cleanup()
-                except Exception as e:
-                    logger.error(f"Error cleaning up service {service.__class__.__name__}: {e}")
+                await self._cleanup_service(service)
+        
+        # Release pooled HTTP connections
+        if self.http_session:
+            self.http_session.close()
+    
+    async def _cleanup_service(self, service) -> None:
+        """Cleanup a single service, logging rather than raising errors"""
+        try:
+            await service.cleanup()
+        except Exception as e:
+            logger = logging.getLogger(__name__)
+            logger.error("Error cleaning up service %s: %s", service.__class__.__name__, e)
@@ -1,122 +1,273 @@
 """Session management commands for the Instagram bot."""
 
-from typing import Optional, List, Any
+from typing import Optional, List, Any, Dict, Tuple
 import asyncio
+import io
 import logging
 import json
+import os
+import re
+import tempfile
+import time
 from pathlib import Path
 from datetime import datetime, timedelta
-from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
+from telegram import Update, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
 from telegram.ext import ContextTypes
 from src.core.session_manager import InstagramSessionManager
 from src.services.session_storage import SessionStorageService
 
 logger = logging.getLogger(__name__)
 
+# Parameterised buttons: activate_session_<id>, delete_session_<id>, session_page_<n>
+_CB_RE = re.compile(r"^(?P<op>activate_session|delete_session|session_page)_(?P<arg>\d+)$")
+
+_REQUIRED_COOKIES = frozenset({"sessionid", "csrftoken"})
+_INSTAGRAM_MARKER = b"instagram.com"
+
+# Status emojis indexed by how many day thresholds a session has crossed
+_EXPIRY_EMOJI = ("⛔️", "⚠️", "✅")      # (days_left > 0) + (days_left > 7)
+_VALIDATE_EMOJI = ("✅", "⚠️", "⛔️")    # (days_since >= 1) + (days_since >= 7)
+_STATUS_LABEL = ("⏸️ Inactive", "✅ Active")  # indexed by is_active
+
+_UPLOAD_KEYBOARD = InlineKeyboardMarkup(
+    [[InlineKeyboardButton("📤 Upload New Session", callback_data="upload_cookies")]]
+)
+
+# Static session menu keyboards and texts, built once at import
+_ACTIVE_MENU_MARKUP = InlineKeyboardMarkup([
+    [InlineKeyboardButton("✅ Check Status", callback_data="check_status")],
+    [InlineKeyboardButton("🔄 Update Session", callback_data="upload_cookies")],
+    [InlineKeyboardButton("❌ Logout", callback_data="logout")]
+])
+_INACTIVE_MENU_MARKUP = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🔑 Login with Cookies", callback_data="upload_cookies")],
+    [InlineKeyboardButton("❓ How to Get Cookies", callback_data="cookie_help")]
+])
+_BACK_MARKUP = InlineKeyboardMarkup([[InlineKeyboardButton("🔙 Back", callback_data="back_to_main")]])
+_LOGOUT_CONFIRM_MARKUP = InlineKeyboardMarkup([[
+    InlineKeyboardButton("✅ Yes", callback_data="confirm_logout"),
+    InlineKeyboardButton("❌ No", callback_data="back_to_main")
+]])
+_LOGGED_OUT_MARKUP = InlineKeyboardMarkup([[InlineKeyboardButton("🔑 Login Again", callback_data="upload_cookies")]])
+
+_UPLOAD_HELP_TEXT = (
+    "📤 *Upload Your Instagram Cookies*\n\n"
+    "1️⃣ Login to Instagram in your browser\n"
+    "2️⃣ Install a cookie exporter extension:\n"
+    "   • Firefox: 'Export Cookies'\n"
+    "   • Chrome: 'EditThisCookie'\n\n"
+    "3️⃣ Export cookies as Netscape format\n"
+    "4️⃣ Send the cookies.txt file here\n\n"
+    "_Just upload the file - I'll guide you through the rest!_"
+)
+_COOKIE_HELP_TEXT = (
+    "❓ *How to Get Instagram Cookies*\n\n"
+    "*Chrome Users:*\n"
+    "1. Install 'EditThisCookie' extension\n"
+    "2. Go to instagram.com and login\n"
+    "3. Click extension icon → Export\n"
+    "4. Save as cookies.txt\n\n"
+    "*Firefox Users:*\n"
+    "1. Install 'Export Cookies' extension\n"
+    "2. Go to instagram.com and login\n"
+    "3. Right-click → Export Cookies\n"
+    "4. Choose Netscape format\n\n"
+    "_Need help? Contact @kelvitz716_"
+)
+
+_RULER = "-" * 30
+_SESSION_LIST_HEADER = "🔐 INSTAGRAM SESSIONS\n" + "=" * 30 + "\n"
+_SESSION_TEMPLATE = (
+    "\n\n📎 SESSION #{id}\n"
+    + _RULER + "\n"
+    "├─ 🔵 Status    : {status}\n"
+    "├─ 📂 Type      : {type_icon} {stype}\n"
+    "├─ 🔄 Validated : {vstat} {vtext}\n"
+    "╰─ ⏳ Expires   : {estat} {etext}"
+)
+
 class SessionCommands:
     """Mixin class for session management commands."""
+
+    # How long a /session_list lookup is reused for repeat presses (seconds)
+    SESSION_LIST_TTL = 5.0
+    # Number of cached users after which stale session list entries are swept
+    SESSION_LIST_CACHE_SIZE = 256
+    # How often expired sessions are purged (seconds)
+    SESSION_CLEANUP_INTERVAL = 3600.0
+    # Largest cookies file accepted for upload (bytes)
+    MAX_COOKIES_FILE_SIZE = 1024 * 1024
+    # Sessions shown per /session_list page; each renders to ~200 characters, so a
+    # full page stays well under Telegram's 4096-character message limit
+    SESSIONS_PER_PAGE = 15
     
     def __init__(self, session_manager: InstagramSessionManager, services: Any):
         self.session_manager = session_manager
         self.services = services
+        self._list_cache: Dict[int, Tuple[float, tuple]] = {}
+        self._cleanup_handle: Optional[asyncio.TimerHandle] = None
+        self._cleanup_task: Optional[asyncio.Task] = None
+        # Handlers for the parameterised buttons matched by _CB_RE
+        self._session_actions = {
+            "activate_session": self._do_activate,
+            "delete_session": self._do_delete,
+            "session_page": self.handle_session_page,
+        }
+        # Handlers for the fixed-name buttons, keyed by callback data
+        self._button_handlers = {
+            "upload_cookies": self._btn_upload_cookies,
+            "cookie_help": self._btn_cookie_help,
+            "check_status": self._btn_check_status,
+            "logout": self._btn_logout,
+            "confirm_logout": self._btn_confirm_logout,
+            "back_to_main": self._btn_back_to_main,
+        }
+
+    async def _fetch_session_list(self, user_id: int) -> tuple:
+        """Fetch storage status, sessions and stats for a user, reusing recent results."""
+        now = time.monotonic()
+        cached = self._list_cache.get(user_id)
+        if cached and now - cached[0] < self.SESSION_LIST_TTL:
+            return cached[1]
+
+        storage = self.services.session_storage
+        storage_status = await storage.check_storage()
+        if not storage_status['healthy']:
+            # Not worth querying (or caching) sessions from broken storage
+            return storage_status, [], {}
+
+        sessions, stats = await asyncio.gather(
+            storage.get_all_sessions(user_id),
+            storage.get_session_stats(user_id)
+        )
+        result = (storage_status, sessions, stats)
+        if len(self._list_cache) >= self.SESSION_LIST_CACHE_SIZE:
+            # Keep only entries that are still fresh so the cache stays bounded
+            cutoff = now - self.SESSION_LIST_TTL
+            self._list_cache = {uid: entry for uid, entry in self._list_cache.items() if entry[0] > cutoff}
+        self._list_cache[user_id] = (now, result)
+        return result
+
+    @staticmethod
+    def _storage_warning(storage_status: Dict[str, Any]) -> str:
+        """Describe unhealthy session storage to the user."""
+        return (
+            "⚠️ *Warning:* Session storage issues detected\n\n"
+            f"Issues found: {storage_status['issues']}\n"
+            "Please try again later."
+        )
+
+    def _invalidate_session_list(self, user_id: int) -> None:
+        """Drop the cached session list for a user after their sessions change."""
+        self._list_cache.pop(user_id, None)
+
+    @staticmethod
+    def _make_temp_path(user_id: int) -> Path:
+        """Reserve a unique temp file for an uploaded cookies file."""
+        with tempfile.NamedTemporaryFile(prefix=f"cookies_{user_id}_", suffix=".txt", delete=False) as tf:
+            return Path(tf.name)
     
     async def handle_session(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Interactive session management command."""
         if not update.message or not update.effective_user:
             return
 
-        # Get current session status
-        is_valid = await self.session_manager.is_valid()
-        
-        if not update.message.document:
-            # Show different options based on session status
-            if is_valid:
-                keyboard = [
-                    [InlineKeyboardButton("✅ Check Status", callback_data="check_status")],
-                    [InlineKeyboardButton("🔄 Update Session", callback_data="upload_cookies")],
-                    [InlineKeyboardButton("❌ Logout", callback_data="logout")]
-                ]
-                status = "🟢 *Active*"
-            else:
-                keyboard = [
-                    [InlineKeyboardButton("🔑 Login with Cookies", callback_data="upload_cookies")],
-                    [InlineKeyboardButton("❓ How to Get Cookies", callback_data="cookie_help")]
-                ]
-                status = "🔴 *Not Logged In*"
-            
+        if update.message.document:
+            await self.handle_session_upload(update, context)
+            return
+
+        text, markup = await self._session_menu()
+        await update.message.reply_text(text, reply_markup=markup, parse_mode='Markdown')
+
+    async def _session_menu(self) -> Tuple[str, InlineKeyboardMarkup]:
+        """Build the main session menu text and keyboard."""
+        # Show different options based on session status
+        if await self.session_manager.is_valid():
+            markup = _ACTIVE_MENU_MARKUP
+            status = "🟢 *Active*"
+        else:
+            markup = _INACTIVE_MENU_MARKUP
+            status = "🔴 *Not Logged In*"
+
+        return (
+            "🔐 *Instagram Session Manager*\n\n"
+            f"Current Status: {status}\n\n"
+            "Select an option below to manage your Instagram login.",
+            markup
+        )
+
+    async def handle_session_upload(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Handle an uploaded cookies file, downloading it exactly once."""
+        if not update.message or not update.message.document or not update.effective_user:
+            return
+
+        # Reject oversized files before spending a download on them
+        if (update.message.document.file_size or 0) > self.MAX_COOKIES_FILE_SIZE:
             await update.message.reply_text(
-                "🔐 *Instagram Session Manager*\n\n"
-                f"Current Status: {status}\n\n"
-                "Select an option below to manage your Instagram login.",
-                reply_markup=InlineKeyboardMarkup(keyboard),
-                parse_mode='Markdown'
+                "❌ File too large.\n"
+                "A cookies.txt file should be well under 1 MB."
             )
             return
 
-        # Check if this is a file upload with /session caption
+        # Files captioned /session are installed directly as gallery-dl cookies
         if update.message.caption and update.message.caption.strip().lower() == "/session":
             try:
-                # Download the file to a unique temp path
+                # Cookie files are small, so download straight into memory
                 file = await context.bot.get_file(update.message.document.file_id)
-                temp_path = Path(f"/tmp/cookies_{update.effective_user.id}_{datetime.now().timestamp()}.txt")
-                
-                # Download the file
-                await file.download_to_drive(temp_path)
+                cookies_data = await file.download_as_bytearray()
                 
                 # Process the cookies file
-                await self._process_cookies_file(update, temp_path)
+                await self._process_cookies_file(update, cookies_data)
                 
             except Exception as e:
-                logger.error(f"Failed to process cookie file: {e}", exc_info=True)
+                logger.error("Failed to process cookie file: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
                 await update.message.reply_text(
                     f"❌ Failed to process the cookie file: {str(e)}\n\n"
                     "Please make sure it's a valid Netscape format cookies.txt file."
                 )
-                
-            finally:
-                # Clean up temp file
-                if temp_path.exists():
-                    temp_path.unlink()
+            return
             
+        temp_path: Optional[Path] = None
         try:
             # Download the file
             file = await context.bot.get_file(update.message.document.file_id)
-            temp_path = Path(f"/tmp/cookies_{update.effective_user.id}_{datetime.now().timestamp()}.txt")
+            temp_path = await asyncio.to_thread(self._make_temp_path, update.effective_user.id)
             await file.download_to_drive(temp_path)
             
-            # Try loading and validating the cookies
-            try:
-                session = await self.session_manager.load_cookies_from_file(temp_path)
-                if not session or not all(cookie in session for cookie in ['sessionid', 'csrftoken']):
-                    raise ValueError("Missing required cookies (sessionid and csrftoken)")
-                    
-                # Store the session
-                await self.services.session_storage.store_session(
-                    user_id=update.effective_user.id,
-                    username=session.get('ds_user_id', 'unknown'),
-                    session_type='cookies_file',
-                    session_data=session,
-                    cookies_file_path=temp_path,
-                    make_active=True
-                )
-                
-                await update.message.reply_text(
-                    "✅ Cookie file uploaded and validated successfully!\n"
-                    "This session is now active and will be used for downloads."
-                )
+            # Load and validate the cookies
+            # The temp file is deleted below, so it can be linked rather than copied
+            session = await self.session_manager.load_cookies_from_file(temp_path, owns_source=True)
+            if not session or not _REQUIRED_COOKIES.issubset(session):
+                raise ValueError("Missing required cookies (sessionid and csrftoken)")
                 
-            finally:
-                # Clean up temp file
-                if temp_path.exists():
-                    temp_path.unlink()
+            # Store the session
+            await self.services.session_storage.store_session(
+                user_id=update.effective_user.id,
+                username=session.get('ds_user_id', 'unknown'),
+                session_type='cookies_file',
+                session_data=session,
+                cookies_file_path=temp_path,
+                make_active=True
+            )
+            self._invalidate_session_list(update.effective_user.id)
+            
+            await update.message.reply_text(
+                "✅ Cookie file uploaded and validated successfully!\n"
+                "This session is now active and will be used for downloads."
+            )
                     
         except Exception as e:
-            logger.error(f"Failed to process cookie file: {e}")
+            logger.error("Failed to process cookie file: %s", e)
             await update.message.reply_text(
                 "❌ Failed to process the cookie file.\n"
                 "Please ensure it's a valid Netscape format cookies.txt file "
                 "containing Instagram cookies (sessionid and csrftoken)."
             )
+
+        finally:
+            # Clean up temp file, even if the download itself failed
+            if temp_path:
+                await asyncio.to_thread(temp_path.unlink, missing_ok=True)
     
     async def handle_session_list(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle the /session_list command."""
@@ -124,116 +275,130 @@ class SessionCommands:
             return
             
         try:
-            # Validate storage
-            storage_status = await self.services.session_storage.check_storage()
+            # Validate storage and get all sessions with statistics
+            storage_status, sessions, stats = await self._fetch_session_list(update.effective_user.id)
             if not storage_status['healthy']:
                 await update.message.reply_text(
-                    "⚠️ *Warning:* Session storage issues detected\n\n"
-                    f"Issues found: {storage_status['issues']}\n"
-                    "Some features may be limited.",
-                    parse_mode='Markdown'
+                    self._storage_warning(storage_status), parse_mode='Markdown'
                 )
-            
-            # Get all sessions with statistics
-            sessions = await self.services.session_storage.get_all_sessions(update.effective_user.id)
-            stats = await self.services.session_storage.get_session_stats(update.effective_user.id)
+                return
+
             
             if not sessions:
-                keyboard = [[InlineKeyboardButton("📤 Upload New Session", callback_data="upload_cookies")]]
                 await update.message.reply_text(
                     "📭 *No Active Sessions*\n\n"
                     "You don't have any Instagram sessions stored.\n"
                     "Would you like to upload a new session?",
-                    reply_markup=InlineKeyboardMarkup(keyboard),
+                    reply_markup=_UPLOAD_KEYBOARD,
                     parse_mode='Markdown'
                 )
                 return
                 
-            # Format session list with new aesthetic
-            now = datetime.now()
-            response = [
-                "🔐 INSTAGRAM SESSIONS\n"
-                "==============================\n"
-            ]
+            # Format session list with new aesthetic, starting at the first page
+            text, markup = self._render_session_page(sessions, 0)
+            await update.message.reply_text(text, reply_markup=markup)
             
-            for session in sessions:
-                expires = session['expires_at']
-                last_validated = session.get('last_validated')
-
-                # Format dates if they are strings
-                if isinstance(expires, str):
-                    expires = datetime.fromisoformat(expires.replace('Z', '+00:00'))
-                if isinstance(last_validated, str):
-                    last_validated = datetime.fromisoformat(last_validated.replace('Z', '+00:00'))
-
-                # Calculate expiry status
-                if expires:
-                    days_left = (expires - now).days
-                    if days_left > 7:
-                        expiry_status = "✅"
-                    elif days_left > 0:
-                        expiry_status = "⚠️"
-                    else:
-                        expiry_status = "⛔️"
-                    expires_text = f"Expires in {days_left} days"
-                else:
-                    expiry_status = "ℹ️"
-                    expires_text = "No expiration"
-
-                # Calculate validation status
-                if last_validated:
-                    days_since = (now - last_validated).days
-                    if days_since < 1:
-                        validate_status = "✅"
-                    elif days_since < 7:
-                        validate_status = "⚠️"
-                    else:
-                        validate_status = "⛔️"
-                    last_validated_text = f"Validated {days_since}d ago"
-                else:
-                    validate_status = "⛔️"
-                    last_validated_text = "Never validated"
-
-                session_status = "✅ Active" if session['is_active'] else "⏸️ Inactive"
-                type_icon = "📁" if session['session_type'] == 'cookies_file' else "🦊"
-                
-                response.append(
-                    f"\n📎 SESSION #{session['id']}\n"
-                    f"------------------------------\n"
-                    f"├─ 🔵 Status    : {session_status}\n"
-                    f"├─ 📂 Type      : {type_icon} {session['session_type']}\n"
-                    f"├─ 🔄 Validated : {validate_status} {last_validated_text}\n"
-                    f"╰─ ⏳ Expires   : {expiry_status} {expires_text}"
-                )
-                
+        except Exception as e:
+            logger.error("Failed to list sessions: %s", e)
+            await update.message.reply_text(
+                "❌ Failed to retrieve sessions. Please try again later."
+            )
+    
+    def _render_session_page(self, sessions: List[Dict[str, Any]], page: int) -> Tuple[str, InlineKeyboardMarkup]:
+        """Render one page of the session list and its keyboard."""
+        # Whole-day differences via ordinals, no timedelta per session
+        now_ord = datetime.now().toordinal()
+        pages = max(1, -(-len(sessions) // self.SESSIONS_PER_PAGE))
+        page = min(max(page, 0), pages - 1)
+        first = page * self.SESSIONS_PER_PAGE
+        sessions = sessions[first:first + self.SESSIONS_PER_PAGE]
+
+        buf = io.StringIO()
+        buf.write(_SESSION_LIST_HEADER)
+        if pages > 1:
+            buf.write(f"Page {page + 1}/{pages}\n")
+        keyboard = []
+        # Bind loop-invariant lookups once
+        write = buf.write
+        render = _SESSION_TEMPLATE.format_map
+        
+        for session in sessions:
+            # Unpack each field once; dates arrive already parsed from session storage
+            sid, is_active, stype = session['id'], session['is_active'], session['session_type']
+            expires, last_validated = session['expires_at'], session.get('last_validated')
+
+            # Calculate expiry status
+            if expires:
+                days_left = expires.toordinal() - now_ord
+                expiry_status = _EXPIRY_EMOJI[(days_left > 0) + (days_left > 7)]
+                expires_text = f"Expires in {days_left} days"
+            else:
+                expiry_status = "ℹ️"
+                expires_text = "No expiration"
+
+            # Calculate validation status
+            if last_validated:
+                days_since = now_ord - last_validated.toordinal()
+                validate_status = _VALIDATE_EMOJI[(days_since >= 1) + (days_since >= 7)]
+                last_validated_text = f"Validated {days_since}d ago"
+            else:
+                validate_status = "⛔️"
+                last_validated_text = "Never validated"
+
+            session_status = _STATUS_LABEL[bool(is_active)]
+            type_icon = "📁" if stype == 'cookies_file' else "🦊"
+            
+            write(render({
+                'id': sid,
+                'status': session_status,
+                'type_icon': type_icon,
+                'stype': stype,
+                'vstat': validate_status,
+                'vtext': last_validated_text,
+                'estat': expiry_status,
+                'etext': expires_text,
+            }))
+
             # Add action buttons
-            keyboard = []
-            for session in sessions:
-                if not session['is_active']:
-                    keyboard.append([
-                        InlineKeyboardButton(
-                            f"Activate Session #{session['id']}", 
-                            callback_data=f"activate_session_{session['id']}"
-                        )
-                    ])
+            if not is_active:
                 keyboard.append([
                     InlineKeyboardButton(
-                        f"Delete Session #{session['id']}", 
-                        callback_data=f"delete_session_{session['id']}"
+                        f"Activate Session #{sid}", 
+                        callback_data=f"activate_session_{sid}"
                     )
                 ])
-                
-            await update.message.reply_text(
-                "\n".join(response),
-                reply_markup=InlineKeyboardMarkup(keyboard)
-            )
-            
-        except Exception as e:
-            logger.error(f"Failed to list sessions: {e}")
-            await update.message.reply_text(
-                "❌ Failed to retrieve sessions. Please try again later."
+            keyboard.append([
+                InlineKeyboardButton(
+                    f"Delete Session #{sid}", 
+                    callback_data=f"delete_session_{sid}"
+                )
+            ])
+
+        nav = []
+        if page > 0:
+            nav.append(InlineKeyboardButton("◀️ Prev", callback_data=f"session_page_{page - 1}"))
+        if page < pages - 1:
+            nav.append(InlineKeyboardButton("Next ▶️", callback_data=f"session_page_{page + 1}"))
+        if nav:
+            keyboard.append(nav)
+
+        return buf.getvalue(), InlineKeyboardMarkup(keyboard)
+
+    async def handle_session_page(self, update: Update, context: ContextTypes.DEFAULT_TYPE, page: int) -> None:
+        """Show another page of the session list by editing the message in place."""
+        storage_status, sessions, _ = await self._fetch_session_list(update.effective_user.id)
+        if not storage_status['healthy']:
+            await update.callback_query.edit_message_text(
+                self._storage_warning(storage_status), parse_mode='Markdown'
             )
-    
+            return
+        if not sessions:
+            await update.callback_query.edit_message_text("📭 No sessions stored.")
+            return
+
+        text, markup = self._render_session_page(sessions, page)
+        await update.callback_query.edit_message_text(text, reply_markup=markup)
+
     async def handle_session_button(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle interactive session management buttons."""
         if not update.callback_query or not update.effective_user:
@@ -242,90 +407,91 @@ class SessionCommands:
         query = update.callback_query
         await query.answer()
         
+        match = _CB_RE.match(query.data or "")
+        if match:
+            action = self._session_actions[match["op"]](update, context, int(match["arg"]))
+        else:
+            handler = self._button_handlers.get(query.data)
+            if handler is None:
+                logger.debug("Ignoring non-session button: %s", query.data)
+                return
+            action = handler(query, update, context)
+
         try:
-            if query.data == "upload_cookies":
-                await query.edit_message_text(
-                    "📤 *Upload Your Instagram Cookies*\n\n"
-                    "1️⃣ Login to Instagram in your browser\n"
-                    "2️⃣ Install a cookie exporter extension:\n"
-                    "   • Firefox: 'Export Cookies'\n"
-                    "   • Chrome: 'EditThisCookie'\n\n"
-                    "3️⃣ Export cookies as Netscape format\n"
-                    "4️⃣ Send the cookies.txt file here\n\n"
-                    "_Just upload the file - I'll guide you through the rest!_",
-                    parse_mode='Markdown'
-                )
-                
-            elif query.data == "cookie_help":
-                keyboard = [[InlineKeyboardButton("🔙 Back", callback_data="back_to_main")]]
-                await query.edit_message_text(
-                    "❓ *How to Get Instagram Cookies*\n\n"
-                    "*Chrome Users:*\n"
-                    "1. Install 'EditThisCookie' extension\n"
-                    "2. Go to instagram.com and login\n"
-                    "3. Click extension icon → Export\n"
-                    "4. Save as cookies.txt\n\n"
-                    "*Firefox Users:*\n"
-                    "1. Install 'Export Cookies' extension\n"
-                    "2. Go to instagram.com and login\n"
-                    "3. Right-click → Export Cookies\n"
-                    "4. Choose Netscape format\n\n"
-                    "_Need help? Contact @kelvitz716_",
-                    reply_markup=InlineKeyboardMarkup(keyboard),
-                    parse_mode='Markdown'
-                )
-                
-            elif query.data == "check_status":
-                is_valid = await self.session_manager.is_valid()
-                last_refresh = self.session_manager.last_refresh_time
-                refresh_age = datetime.now() - last_refresh if last_refresh else None
-                
-                status_text = "🔐 *Session Status*\n\n"
-                status_text += "Status: ✅ Active\n" if is_valid else "Status: ❌ Invalid\n"
-                if refresh_age:
-                    status_text += f"Last Verified: {refresh_age.seconds // 60} minutes ago\n"
-                
-                keyboard = [[InlineKeyboardButton("🔙 Back", callback_data="back_to_main")]]
-                await query.edit_message_text(
-                    status_text,
-                    reply_markup=InlineKeyboardMarkup(keyboard),
-                    parse_mode='Markdown'
-                )
-                
-            elif query.data == "logout":
-                keyboard = [
-                    [
-                        InlineKeyboardButton("✅ Yes", callback_data="confirm_logout"),
-                        InlineKeyboardButton("❌ No", callback_data="back_to_main")
-                    ]
-                ]
-                await query.edit_message_text(
-                    "❗ *Confirm Logout*\n\n"
-                    "Are you sure you want to logout?\n"
-                    "This will delete your current session.",
-                    reply_markup=InlineKeyboardMarkup(keyboard),
-                    parse_mode='Markdown'
-                )
-                
-            elif query.data == "confirm_logout":
-                # Clear session
-                await self.session_manager.clear_session()
-                keyboard = [[InlineKeyboardButton("🔑 Login Again", callback_data="upload_cookies")]]
-                await query.edit_message_text(
-                    "✅ *Logged Out Successfully*\n\n"
-                    "Your Instagram session has been removed.\n"
-                    "Click below to login again when ready.",
-                    reply_markup=InlineKeyboardMarkup(keyboard),
-                    parse_mode='Markdown'
-                )
-                
-            elif query.data == "back_to_main":
-                # Return to main session menu
-                await self.handle_session(update, context)
-                    
+            await action
         except Exception as e:
-            logger.error(f"Failed to handle session button: {e}")
+            logger.error("Failed to handle session button %s: %s", query.data, e)
             await query.edit_message_text("❌ An error occurred. Please try again.")
+
+    async def _btn_upload_cookies(self, query: CallbackQuery, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        await query.edit_message_text(_UPLOAD_HELP_TEXT, parse_mode='Markdown')
+
+    async def _btn_cookie_help(self, query: CallbackQuery, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        await query.edit_message_text(
+            _COOKIE_HELP_TEXT,
+            reply_markup=_BACK_MARKUP,
+            parse_mode='Markdown'
+        )
+
+    async def _btn_check_status(self, query: CallbackQuery, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        is_valid = await self.session_manager.is_valid()
+        last_refresh_ts = self.session_manager.last_refresh_ts
+
+        status_text = "🔐 *Session Status*\n\n"
+        status_text += "Status: ✅ Active\n" if is_valid else "Status: ❌ Invalid\n"
+        if last_refresh_ts is not None:
+            age_min = int((time.monotonic() - last_refresh_ts) // 60)
+            status_text += f"Last Verified: {age_min} minutes ago\n"
+
+        await query.edit_message_text(
+            status_text,
+            reply_markup=_BACK_MARKUP,
+            parse_mode='Markdown'
+        )
+
+    async def _btn_logout(self, query: CallbackQuery, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        await query.edit_message_text(
+            "❗ *Confirm Logout*\n\n"
+            "Are you sure you want to logout?\n"
+            "This will delete your current session.",
+            reply_markup=_LOGOUT_CONFIRM_MARKUP,
+            parse_mode='Markdown'
+        )
+
+    async def _btn_confirm_logout(self, query: CallbackQuery, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        await self.session_manager.clear_session()
+        await query.edit_message_text(
+            "✅ *Logged Out Successfully*\n\n"
+            "Your Instagram session has been removed.\n"
+            "Click below to login again when ready.",
+            reply_markup=_LOGGED_OUT_MARKUP,
+            parse_mode='Markdown'
+        )
+
+    async def _btn_back_to_main(self, query: CallbackQuery, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        # Callback updates carry no message to reply to, so redraw the menu in place
+        text, markup = await self._session_menu()
+        await query.edit_message_text(text, reply_markup=markup, parse_mode='Markdown')
+
+    async def _do_activate(self, update: Update, context: ContextTypes.DEFAULT_TYPE, session_id: int) -> None:
+        """Make one of the user's stored sessions the active one."""
+        user_id = update.effective_user.id
+        await self.services.session_storage.set_active_session(user_id, session_id)
+        self._invalidate_session_list(user_id)
+        await update.callback_query.edit_message_text(
+            f"✅ Session #{session_id} is now active.\n"
+            "Use /session_list to view all sessions."
+        )
+
+    async def _do_delete(self, update: Update, context: ContextTypes.DEFAULT_TYPE, session_id: int) -> None:
+        """Delete one of the user's stored sessions."""
+        user_id = update.effective_user.id
+        await self.services.session_storage.delete_session(user_id, session_id)
+        self._invalidate_session_list(user_id)
+        await update.callback_query.edit_message_text(
+            f"🗑 Session #{session_id} deleted.\n"
+            "Use /session_list to view remaining sessions."
+        )
             
     async def handle_session_status(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Check the status of Instagram sessions."""
@@ -342,22 +508,25 @@ class SessionCommands:
                 )
                 return
                 
-            # Check session health
-            status = await self.session_manager.validate_session(active_session['id'])
-            stats = await self.services.session_storage.get_session_stats(update.effective_user.id)
+            # The bot's own cookies decide whether downloads work; is_valid() caches its verdict
+            bot_session_valid, stats = await asyncio.gather(
+                self.session_manager.is_valid(),
+                self.services.session_storage.get_session_stats(update.effective_user.id)
+            )
             
-            response = [
-                "📊 *Session Status Report*\n",
-                f"Session ID: `{active_session['id']}`\n",
-                f"Type: {active_session['session_type']}\n",
-                f"Health: {'✅ Good' if status['valid'] else '❌ Invalid'}\n",
-                f"Downloads: {stats['total_downloads']}\n",
-                f"Success Rate: {stats['success_rate']}%\n",
-                "\n*Storage Stats:*\n",
-                f"Space Used: {stats['storage_used']}\n",
-                f"Downloads Today: {stats['downloads_today']}\n",
+            # Adjacent literals compile to a single f-string, no list or join pass
+            response = (
+                "📊 *Session Status Report*\n"
+                f"Session ID: `{active_session['id']}`\n"
+                f"Type: {active_session['session_type']}\n"
+                f"Bot Session: {'✅ Good' if bot_session_valid else '❌ Invalid'}\n"
+                f"Downloads: {stats['total_downloads']}\n"
+                f"Success Rate: {stats['success_rate']}%\n"
+                "\n*Storage Stats:*\n"
+                f"Space Used: {stats['storage_used']}\n"
+                f"Downloads Today: {stats['downloads_today']}\n"
                 f"Average Size: {stats['avg_download_size']}\n"
-            ]
+            )
             
             keyboard = [
                 [InlineKeyboardButton("🔄 Refresh Status", callback_data=f"refresh_status_{active_session['id']}")],
@@ -365,46 +534,69 @@ class SessionCommands:
             ]
             
             await update.message.reply_text(
-                "".join(response),
+                response,
                 reply_markup=InlineKeyboardMarkup(keyboard),
                 parse_mode='Markdown'
             )
             
         except Exception as e:
-            logger.error(f"Failed to check session status: {e}")
+            logger.error("Failed to check session status: %s", e)
             await update.message.reply_text(
                 "❌ Failed to check session status. Please try again later."
             )
     
+    def schedule_session_cleanup(self) -> None:
+        """Run cleanup_expired_sessions now and re-arm it on the event loop."""
+        self._cleanup_task = asyncio.create_task(self.cleanup_expired_sessions())
+        self._cleanup_handle = asyncio.get_running_loop().call_later(
+            self.SESSION_CLEANUP_INTERVAL, self.schedule_session_cleanup
+        )
+
+    def cancel_session_cleanup(self) -> None:
+        """Stop the periodic expired-session cleanup, including a run in progress."""
+        if self._cleanup_handle:
+            self._cleanup_handle.cancel()
+            self._cleanup_handle = None
+        if self._cleanup_task:
+            self._cleanup_task.cancel()
+            self._cleanup_task = None
+
     async def cleanup_expired_sessions(self) -> None:
-        """Clean up expired sessions. Called periodically by the maintenance task."""
+        """Clean up expired sessions. Called periodically by schedule_session_cleanup."""
         try:
-            count = await self.session_storage.cleanup_expired_sessions()
+            count = await self.services.session_storage.cleanup_expired_sessions()
             if count > 0:
-                logger.info(f"Cleaned up {count} expired sessions")
+                logger.info("Cleaned up %s expired sessions", count)
         except Exception as e:
-            logger.error(f"Failed to cleanup expired sessions: {e}")
+            logger.error("Failed to cleanup expired sessions: %s", e)
             
-    async def _process_cookies_file(self, update: Update, temp_path: Path):
-        """Process and validate an uploaded cookies file."""
+    @staticmethod
+    def _install_cookies_file(cookies_data: bytes, cookies_dst: Path) -> None:
+        """Write cookies next to the destination, then atomically move them into place."""
+        temp_dest = cookies_dst.with_suffix(".txt.tmp")
+        # Same filesystem as the destination so the final replace stays atomic
+        fd = os.open(temp_dest, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.fchmod(fd, 0o644)  # Set proper permissions regardless of umask
+            view = memoryview(cookies_data)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+        os.replace(temp_dest, cookies_dst)
+
+    async def _process_cookies_file(self, update: Update, cookies_data: bytes):
+        """Process and validate the contents of an uploaded cookies file."""
         try:
             # Copy to destination with proper permissions
             cookies_dst = Path("gallery-dl-cookies.txt")
             
-            # Read cookies first to validate
-            cookies_content = temp_path.read_text()
-            if "instagram.com" not in cookies_content:
+            # Validate on the raw bytes, no decoding needed
+            if _INSTAGRAM_MARKER not in cookies_data:
                 raise ValueError("No Instagram cookies found in file")
                 
-            # Write atomically to avoid file busy errors
-            temp_dest = cookies_dst.with_suffix(".txt.tmp")
-            temp_dest.write_text(cookies_content)
-            temp_dest.chmod(0o644)  # Set proper permissions
-            temp_dest.rename(cookies_dst)
-            
-            # Wait for file to be fully available
-            while not cookies_dst.exists():
-                await asyncio.sleep(0.1)
+            # Write atomically to avoid file busy errors, in one worker thread hop
+            await asyncio.to_thread(self._install_cookies_file, cookies_data, cookies_dst)
             
             await update.message.reply_text(
                 "✅ Cookie file processed and activated successfully!\n"
@@ -412,5 +604,5 @@ class SessionCommands:
             )
             
         except Exception as e:
-            logger.error(f"Error processing cookies: {e}", exc_info=True)
+            logger.error("Error processing cookies: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
             raise ValueError(f"Failed to process cookies: {str(e)}")
\ No newline at end of file
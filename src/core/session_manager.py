@@ -1,16 +1,24 @@
 """Session manager for Instagram cookie management using Netscape format cookies file."""
+import asyncio
+import json
 import logging
 import os
+import random
+import secrets
 import time
 import shutil
 from pathlib import Path
-from typing import Dict, Optional, Tuple
-import requests
-from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Dict, Iterator, Optional, Tuple
+
+if TYPE_CHECKING:
+    import requests
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Netscape cookies.txt marks HttpOnly cookies by prefixing the domain field
+_HTTPONLY_PREFIX = '#HttpOnly_'
+
 class InstagramSessionError(Exception):
     """Exception raised for Instagram session errors."""
     def __init__(self, message: str, is_rate_limit: bool = False):
@@ -20,10 +28,14 @@ class InstagramSessionError(Exception):
 class InstagramSessionManager:
     """Manages Instagram sessions using Netscape-format cookies."""
 
-    REQUIRED_COOKIES = ['sessionid', 'csrftoken']
+    REQUIRED_COOKIES = frozenset({'sessionid', 'csrftoken'})
     COOKIE_DOMAIN = '.instagram.com'
-    MANUAL_CHECK_THRESHOLD = timedelta(minutes=10)  # If cookies refreshed within this time, might be rate limiting
+    MANUAL_CHECK_THRESHOLD_S = 600.0  # If cookies refreshed within this many seconds, might be rate limiting
+    REVALIDATE_AFTER_S = 3600.0  # Probe Instagram again once the last refresh is this old
     SESSION_REFRESH_URL = 'https://www.instagram.com/accounts/login/ajax/'
+    VALIDITY_CACHE_TTL = 30.0  # Seconds an is_valid() verdict is reused
+    MAX_DELAY = 30.0  # Upper bound on a single retry back-off (seconds)
+    HTTP_POOL_SIZE = 4  # Keep-alive connections to Instagram; probes are few and mostly sequential
 
     def __init__(self, downloads_path: Path, cookies_file: Optional[Path] = None):
         """Initialize the session manager.
@@ -35,16 +47,24 @@ class InstagramSessionManager:
         self.downloads_path = downloads_path
         self.cookies_file = cookies_file
         self._session_cookies: Dict[str, str] = {}
-        self._last_cookie_refresh = None  # Timestamp of last successful cookie refresh
+        self.last_refresh_ts: Optional[float] = None  # time.monotonic() of last successful cookie refresh
         self._is_valid = False
+        self.http: Optional["requests.Session"] = None  # Shared connection pool, if injected
+        self._owns_http = False  # True when self.http was created here rather than injected
+        # (monotonic expiry, cookies file mtime, verdict) of the last is_valid() check
+        self._validity_cache: Optional[Tuple[float, Optional[float], bool]] = None
+        self._probe_headers: Optional[Dict[str, str]] = None  # Built lazily from the current csrftoken
         if cookies_file and cookies_file.exists():
             self._load_cookies()
 
-    async def load_cookies_from_file(self, file_path: Path) -> Dict[str, str]:
+    async def load_cookies_from_file(self, file_path: Path, owns_source: bool = False) -> Dict[str, str]:
         """Load cookies from a file and store them in the configured location.
         
         Args:
             file_path: Path to the cookie file to load
+            owns_source: True if file_path is a throwaway file (e.g. an upload
+                temp file) that the caller will not touch again, so it may be
+                hard-linked into place instead of copied
             
         Returns:
             Dict containing the session cookies
@@ -52,56 +72,136 @@ class InstagramSessionManager:
         Raises:
             InstagramSessionError: If cookies are invalid or can't be loaded
         """
+        # Parsing and copying the file is blocking work, keep it off the event loop
+        return await asyncio.to_thread(self._import_cookies_file, file_path, owns_source)
+
+    def _import_cookies_file(self, file_path: Path, owns_source: bool = False) -> Dict[str, str]:
+        """Synchronous body of load_cookies_from_file."""
         try:
             # Make sure the file exists
             if not file_path.exists():
                 raise InstagramSessionError("Cookie file not found")
 
             # Parse cookies from file
-            cookies = self._load_netscape_cookies(file_path)
-            session_cookies = {}
-
-            # Extract Instagram cookies
-            for cookie in cookies:
-                if cookie['domain'].endswith(self.COOKIE_DOMAIN):
-                    masked_value = f"{str(cookie['value'])[:10]}..."
-                    logger.debug(f"Found cookie: {cookie['name']} = {masked_value}")
-                    session_cookies[cookie['name']] = cookie['value']
+            session_cookies = self._extract_session_cookies(file_path)
 
             # Validate required cookies are present
-            missing_cookies = [name for name in self.REQUIRED_COOKIES 
-                             if name not in session_cookies]
-                             
+            missing_cookies = self.REQUIRED_COOKIES - session_cookies.keys()
             if missing_cookies:
                 raise InstagramSessionError(
-                    f"Missing required cookies: {', '.join(missing_cookies)}"
+                    f"Missing required cookies: {', '.join(sorted(missing_cookies))}"
                 )
 
             # If file is not already in the configured location, copy it
             if file_path != self.cookies_file:
                 os.makedirs(os.path.dirname(self.cookies_file), exist_ok=True)
-                shutil.copy2(file_path, self.cookies_file)
+                self._install_file(file_path, self.cookies_file, link=owns_source)
             
             # Load the cookies into the manager
             self._session_cookies = session_cookies
-            self._last_cookie_refresh = datetime.now()
+            self.last_refresh_ts = time.monotonic()
             self._is_valid = True
+            self.clear_cache()
 
             return session_cookies
 
         except Exception as e:
             raise InstagramSessionError(f"Failed to load cookies: {str(e)}")
 
+    @staticmethod
+    def _install_file(src: Path, dst: Path, link: bool = False) -> None:
+        """Atomically place a copy of src at dst.
+
+        With link=True, dst is hard-linked to src when both are on the same
+        filesystem. They then share one inode, so later writes to src also
+        change dst. Only pass it for throwaway sources the caller owns.
+        """
+        tmp = dst.with_name(f".{dst.name}.{secrets.token_hex(4)}.tmp")
+        try:
+            if link:
+                try:
+                    os.link(src, tmp)
+                except OSError:
+                    # Cross-device or no hard links, fall back to copying
+                    link = False
+            if not link:
+                # copy2 already uses sendfile on Linux
+                shutil.copy2(src, tmp)
+            os.replace(tmp, dst)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+
     async def is_valid(self) -> bool:
-        """Check if the current session is valid."""
+        """Check if the current session is valid, reusing a recent verdict."""
         try:
-            if not self._session_cookies:
-                return False
-                
-            # Check if we have required cookies
-            missing_cookies = [name for name in self.REQUIRED_COOKIES 
-                             if name not in self._session_cookies]
-            if missing_cookies:
+            mtime = self.cookies_file.stat().st_mtime if self.cookies_file else None
+        except OSError:
+            mtime = None
+
+        # A changed cookies file invalidates the cached verdict immediately
+        cached = self._validity_cache
+        if cached and time.monotonic() < cached[0] and cached[1] == mtime:
+            return cached[2]
+
+        verdict = await self._check_validity()
+        self._validity_cache = (time.monotonic() + self.VALIDITY_CACHE_TTL, mtime, verdict)
+        return verdict
+
+    @classmethod
+    def create_http_session(cls) -> "requests.Session":
+        """Build a keep-alive requests.Session sized for validation probes."""
+        # Imported on first use; the cookies-file path never needs requests
+        import requests
+        http = requests.Session()
+        http.mount('https://', requests.adapters.HTTPAdapter(
+            pool_connections=cls.HTTP_POOL_SIZE, pool_maxsize=cls.HTTP_POOL_SIZE, max_retries=0
+        ))
+        return http
+
+    def _get_http(self) -> "requests.Session":
+        """Return the pooled HTTP session, creating a private one if none was injected."""
+        if self.http is None:
+            self.http = self.create_http_session()
+            self._owns_http = True
+        return self.http
+
+    def close(self) -> None:
+        """Release the private HTTP session; an injected one is closed by its owner."""
+        if self._owns_http and self.http is not None:
+            self.http.close()
+            self.http = None
+            self._owns_http = False
+
+    @staticmethod
+    def _is_json(response: "requests.Response") -> bool:
+        """Check that a probe response carries JSON rather than an HTML page."""
+        return 'json' in response.headers.get('Content-Type', '')
+
+    @staticmethod
+    def _has_config(body: bytes) -> bool:
+        """Check that a shared_data JSON body has a top-level "config" key."""
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return False
+        return isinstance(data, dict) and 'config' in data
+
+    def _has_required_values(self) -> bool:
+        """Check that every required cookie is present with a non-empty value."""
+        cookies = self._session_cookies
+        return all(cookies.get(name) for name in self.REQUIRED_COOKIES)
+
+    def clear_cache(self) -> None:
+        """Forget the cached is_valid() verdict and cookie-derived probe headers."""
+        self._validity_cache = None
+        self._probe_headers = None
+
+    async def _check_validity(self) -> bool:
+        """Check session validity without consulting the cache."""
+        try:
+            # Missing or empty required cookies can never authenticate, skip the probe
+            if not self._has_required_values():
                 return False
                 
             # Check if cookies file exists
@@ -109,32 +209,34 @@ class InstagramSessionManager:
                 return False
                 
             # If we haven't checked validity recently, do a quick test
-            if not self._last_cookie_refresh or \
-               datetime.now() - self._last_cookie_refresh > timedelta(hours=1):
+            if self.last_refresh_ts is None or \
+               time.monotonic() - self.last_refresh_ts > self.REVALIDATE_AFTER_S:
                 try:
-                    # Make a test request to Instagram
-                    response = requests.get(
+                    # Make a test request to Instagram, in a worker thread so the loop keeps running
+                    response = await asyncio.to_thread(
+                        self._get_http().get,
                         'https://www.instagram.com/data/shared_data/',
                         cookies=self._session_cookies,
                         timeout=10
                     )
                     
-                    if response.status_code != 200 or '"authenticated":false' in response.text:
+                    if (response.status_code != 200 or not self._is_json(response)
+                            or b'"authenticated":false' in response.content):
                         self._is_valid = False
                         return False
                         
                     self._is_valid = True
-                    self._last_cookie_refresh = datetime.now()
+                    self.last_refresh_ts = time.monotonic()
                     
                 except Exception as e:
-                    logger.warning(f"Session validation failed: {e}")
+                    logger.warning("Session validation failed: %s", e)
                     self._is_valid = False
                     return False
                     
             return self._is_valid
             
         except Exception as e:
-            logger.error(f"Error checking session validity: {e}")
+            logger.error("Error checking session validity: %s", e)
             return False
             
     def _load_cookies(self, max_retries: int = 3, initial_delay: float = 1.0) -> None:
@@ -145,28 +247,20 @@ class InstagramSessionManager:
         for attempt in range(max_retries + 1):
             try:
                 if attempt > 0:
-                    logger.info(f"Retrying cookie load (attempt {attempt}/{max_retries})")
+                    logger.info("Retrying cookie load (attempt %d/%d)", attempt, max_retries)
 
                 if not self.cookies_file.exists():
                     raise InstagramSessionError("No cookies.txt file found at specified path. Please provide a valid Netscape-format cookies.txt file.")
 
-                logger.info(f"Loading Instagram cookies from Netscape-format file: {self.cookies_file}")
-                cookies = self._load_netscape_cookies(self.cookies_file)
-
-                # Clear existing cookies
-                old_cookies = self._session_cookies.copy()
-                self._session_cookies.clear()
-
-                # Load new cookies from Netscape format
-                for cookie in cookies:
-                    if cookie['domain'].endswith(self.COOKIE_DOMAIN):
-                        masked_value = f"{str(cookie['value'])[:10]}..."
-                        logger.debug(f"Found cookie: {cookie['name']} = {masked_value}")
-                        self._session_cookies[cookie['name']] = cookie['value']
+                logger.info("Loading Instagram cookies from Netscape-format file: %s", self.cookies_file)
+                # Swap in the freshly parsed cookies, keeping the old dict to compare against
+                old_cookies = self._session_cookies
+                self._session_cookies = self._extract_session_cookies(self.cookies_file)
 
                 # Check if cookies actually changed
                 if self._session_cookies != old_cookies:
-                    self._last_cookie_refresh = datetime.now()
+                    self.last_refresh_ts = time.monotonic()
+                    self.clear_cache()
                     logger.info("Cookies were refreshed")
                 elif not self._session_cookies:
                     raise InstagramSessionError("No Instagram cookies found in cookies.txt file.")
@@ -181,15 +275,15 @@ class InstagramSessionManager:
                 if e.is_rate_limit:
                     raise  # Don't retry rate limit errors
                 last_error = str(e)
-                logger.warning(f"Cookie load attempt {attempt + 1} failed: {last_error}")
+                logger.warning("Cookie load attempt %d failed: %s", attempt + 1, last_error)
             except Exception as e:
                 last_error = str(e)
-                logger.warning(f"Cookie load attempt {attempt + 1} failed: {last_error}")
+                logger.warning("Cookie load attempt %d failed: %s", attempt + 1, last_error)
 
             if attempt < max_retries:
-                import time
                 time.sleep(delay)
-                delay *= 2  # Exponential backoff
+                # Exponential backoff with +/-50% jitter so concurrent retries spread out
+                delay = min(self.MAX_DELAY, delay * 2 * random.uniform(0.5, 1.5))
 
         # All retries failed
         error_msg = f"Failed to load Instagram cookies after {max_retries} attempts. Last error: {last_error}"
@@ -197,54 +291,67 @@ class InstagramSessionManager:
         raise InstagramSessionError(error_msg)
 
     @staticmethod
-    def _load_netscape_cookies(file_path: Path) -> list:
-        """Parse a Netscape-format cookies.txt file and return a list of cookies."""
-        cookies = []
+    def _load_netscape_cookies(file_path: Path) -> Iterator[Dict[str, Any]]:
+        """Parse a Netscape-format cookies.txt file, yielding one cookie at a time."""
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 for line in f:
-                    if line.strip().startswith('#') or not line.strip():
+                    line = line.strip()
+                    if line.startswith(_HTTPONLY_PREFIX):
+                        # Browsers export HttpOnly cookies (sessionid among them) behind this prefix
+                        line = line[len(_HTTPONLY_PREFIX):]
+                    elif not line or line[0] == '#':
                         continue
-                    parts = line.strip().split('\t')
+                    parts = line.split('\t', 6)
                     if len(parts) == 7:
                         domain, flag, path, secure, expires, name, value = parts
-                        cookies.append({
+                        yield {
                             'domain': domain,
                             'name': name,
                             'value': value,
                             'path': path,
                             'secure': secure == 'TRUE',
                             'expires': int(expires) if expires.isdigit() else None
-                        })
+                        }
         except Exception as e:
-            logger.error(f"Failed to parse Netscape cookies file: {e}")
-        return cookies
+            logger.error("Failed to parse Netscape cookies file: %s", e)
     
 
     
+    @classmethod
+    def _extract_session_cookies(cls, file_path: Path) -> Dict[str, str]:
+        """Parse a cookies.txt file and return its Instagram cookies by name."""
+        domain = cls.COOKIE_DOMAIN
+        session_cookies = {
+            cookie['name']: cookie['value']
+            for cookie in cls._load_netscape_cookies(file_path)
+            if cookie['domain'].endswith(domain)
+        }
+        if logger.isEnabledFor(logging.DEBUG):
+            for name, value in session_cookies.items():
+                logger.debug("Found cookie: %s = %s...", name, str(value)[:10])
+        return session_cookies
+
     def _validate_cookies(self) -> None:
         """Validate required cookies and log their presence.
         
         Raises:
             InstagramSessionError: If required cookies are missing
         """
-        for cookie_name in self.REQUIRED_COOKIES:
-            if cookie_name in self._session_cookies:
-                masked_value = f"{str(self._session_cookies[cookie_name])[:10]}..."
-                logger.debug(f"Found {cookie_name} cookie: {masked_value}")
+        if logger.isEnabledFor(logging.DEBUG):
+            for cookie_name in self.REQUIRED_COOKIES & self._session_cookies.keys():
+                logger.debug("Found %s cookie: %s...", cookie_name, str(self._session_cookies[cookie_name])[:10])
             
-        missing_cookies = [name for name in self.REQUIRED_COOKIES 
-                         if name not in self._session_cookies]
-                         
+        missing_cookies = self.REQUIRED_COOKIES - self._session_cookies.keys()
         if missing_cookies:
-            error_msg = f"Missing required cookies: {', '.join(missing_cookies)}"
+            error_msg = f"Missing required cookies: {', '.join(sorted(missing_cookies))}"
             logger.error(error_msg)
             
             # Check if cookies were recently refreshed
-            if (self._last_cookie_refresh and 
-                datetime.now() - self._last_cookie_refresh < self.MANUAL_CHECK_THRESHOLD):
+            refreshed_ago = None if self.last_refresh_ts is None else time.monotonic() - self.last_refresh_ts
+            if refreshed_ago is not None and refreshed_ago < self.MANUAL_CHECK_THRESHOLD_S:
                 error_msg = (
-                    f"Cookies were refreshed {(datetime.now() - self._last_cookie_refresh).total_seconds():.0f} "
+                    f"Cookies were refreshed {refreshed_ago:.0f} "
                     "seconds ago but still invalid. Please check if Instagram is "
                     "accessible in Firefox and refresh the page to update cookies."
                 )
@@ -261,8 +368,8 @@ class InstagramSessionManager:
             bool: True if refresh was successful, False otherwise
         """
         try:
-            # Reload cookies from Firefox
-            self._load_cookies()
+            # Reload cookies; parsing and retry back-off block, so keep them off the loop
+            await asyncio.to_thread(self._load_cookies)
             
             # Validate current cookies
             self._validate_cookies()
@@ -270,7 +377,7 @@ class InstagramSessionManager:
             # Test session validity
             valid, msg = await self._test_session()
             if not valid:
-                logger.warning(f"Session test failed after refresh: {msg}")
+                logger.warning("Session test failed after refresh: %s", msg)
                 return False
                 
             return True
@@ -278,10 +385,10 @@ class InstagramSessionManager:
         except InstagramSessionError as e:
             if e.is_rate_limit:
                 raise  # Re-raise rate limit errors
-            logger.error(f"Session refresh failed: {e}")
+            logger.error("Session refresh failed: %s", e)
             return False
         except Exception as e:
-            logger.error(f"Unexpected error during session refresh: {e}")
+            logger.error("Unexpected error during session refresh: %s", e)
             return False
     
     async def _test_session(self, max_retries: int = 3) -> Tuple[bool, str]:
@@ -293,29 +400,37 @@ class InstagramSessionManager:
         Returns:
             Tuple[bool, str]: (is_valid, message)
         """
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'application/json',
-            'X-CSRFToken': self._session_cookies.get('csrftoken', ''),
-            'X-Requested-With': 'XMLHttpRequest'
-        }
-        
-        cookies = {name: value for name, value in self._session_cookies.items()}
+        if not self._has_required_values():
+            return False, "No session cookies"
+
+        import requests
+
+        headers = self._probe_headers
+        if headers is None:
+            headers = self._probe_headers = {
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+                'Accept': 'application/json',
+                'X-CSRFToken': self._session_cookies.get('csrftoken', ''),
+                'X-Requested-With': 'XMLHttpRequest'
+            }
         last_error = None
         
         for attempt in range(max_retries + 1):
             try:
                 if attempt > 0:
-                    logger.info(f"Retrying session test (attempt {attempt}/{max_retries})")
+                    logger.info("Retrying session test (attempt %d/%d)", attempt, max_retries)
                     
-                response = requests.get(
+                response = await asyncio.to_thread(
+                    self._get_http().get,
                     'https://www.instagram.com/data/shared_data/',
                     headers=headers,
-                    cookies=cookies,
+                    cookies=self._session_cookies,
                     timeout=10 + (attempt * 5)  # Increase timeout with each retry
                 )
                 
-                if response.status_code == 200 and 'config' in response.json():
+                # An HTML login page also embeds "config", hence the content-type requirement
+                if (response.status_code == 200 and self._is_json(response)
+                        and self._has_config(response.content)):
                     return True, "Session is valid"
                 elif response.status_code == 429:
                     msg = "Rate limited by Instagram. Please wait a few minutes."
@@ -326,17 +441,17 @@ class InstagramSessionManager:
                     
             except requests.exceptions.Timeout:
                 last_error = "Request timed out. Instagram might be slow or network issues."
-                logger.warning(f"Session test attempt {attempt + 1} failed: {last_error}")
+                logger.warning("Session test attempt %d failed: %s", attempt + 1, last_error)
             except requests.exceptions.ConnectionError:
                 last_error = "Network connection error. Please check your internet connection."
-                logger.warning(f"Session test attempt {attempt + 1} failed: {last_error}")
+                logger.warning("Session test attempt %d failed: %s", attempt + 1, last_error)
             except Exception as e:
                 last_error = f"Test failed: {str(e)}"
-                logger.warning(f"Session test attempt {attempt + 1} failed: {last_error}")
+                logger.warning("Session test attempt %d failed: %s", attempt + 1, last_error)
             
             if attempt < max_retries:
-                import time
-                time.sleep(2 ** attempt)  # Exponential backoff: 1, 2, 4, 8 seconds
+                # Exponential backoff (1, 2, 4, 8 seconds) with +/-50% jitter
+                await asyncio.sleep(min(self.MAX_DELAY, (2 ** attempt) * random.uniform(0.5, 1.5)))
                 continue
             
             return False, f"Session test failed after {max_retries} attempts. Last error: {last_error}"
@@ -346,8 +461,7 @@ class InstagramSessionManager:
         logger.info("Available Instagram cookies:")
         for name, value in self._session_cookies.items():
             if name in self.REQUIRED_COOKIES:
-                masked_value = f"{str(value)[:10]}..."
-                logger.info(f"Cookie: {name} = {masked_value} (domain: {self.COOKIE_DOMAIN})")
+                logger.info("Cookie: %s = %s... (domain: %s)", name, str(value)[:10], self.COOKIE_DOMAIN)
     
     def check_session(self) -> bool:
         """Check if we have all required cookies."""
@@ -363,13 +477,15 @@ class InstagramSessionManager:
             # Clear memory state
             self._session_cookies.clear()
             self._is_valid = False
-            self._last_cookie_refresh = None
+            self.last_refresh_ts = None
+            self.clear_cache()
+            self.close()
             
             # Remove cookies file if it exists
-            if self.cookies_file and self.cookies_file.exists():
-                self.cookies_file.unlink()
+            if self.cookies_file:
+                self.cookies_file.unlink(missing_ok=True)
             
             logger.info("Session cleared successfully")
         except Exception as e:
-            logger.error(f"Error clearing session: {e}")
+            logger.error("Error clearing session: %s", e)
             raise InstagramSessionError(f"Failed to clear session: {e}")
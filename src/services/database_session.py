@@ -63,10 +63,25 @@ class DatabaseService:
             'delete_session': """
                 DELETE FROM instagram_sessions WHERE id = ?
             """,
+            'get_user_session': """
+                SELECT id, cookies_file_path
+                FROM instagram_sessions
+                WHERE id = ? AND user_id = ?
+            """,
+            'activate_user_session': """
+                UPDATE instagram_sessions
+                SET is_active = (id = ?), updated_at = CURRENT_TIMESTAMP
+                WHERE user_id = ?
+                  AND EXISTS (SELECT 1 FROM instagram_sessions WHERE id = ? AND user_id = ?)
+            """,
             'cleanup_expired_sessions': """
                 DELETE FROM instagram_sessions 
                 WHERE expires_at < CURRENT_TIMESTAMP
                   OR (last_validated < datetime('now', '-7 days') AND NOT is_active)
+            """,
+            'get_cookie_file_paths': """
+                SELECT cookies_file_path FROM instagram_sessions
+                WHERE cookies_file_path IS NOT NULL
             """
         }
         self._prepared_statements.update(statements)
@@ -141,6 +156,27 @@ class DatabaseService:
             )
             return cursor.rowcount > 0
     
+    async def get_user_session(self, user_id: int, session_id: int) -> Optional[Dict[str, Any]]:
+        """Get a session by ID, only if it belongs to the user."""
+        async with self.connection() as conn:
+            cursor = await conn.execute(
+                self._prepared_statements['get_user_session'],
+                (session_id, user_id)
+            )
+            row = await cursor.fetchone()
+            if row:
+                return {'id': row[0], 'cookies_file_path': row[1]}
+            return None
+    
+    async def activate_user_session(self, user_id: int, session_id: int) -> bool:
+        """Make one of a user's sessions active and deactivate the rest in one statement."""
+        async with self.connection() as conn:
+            cursor = await conn.execute(
+                self._prepared_statements['activate_user_session'],
+                (session_id, user_id, session_id, user_id)
+            )
+            return cursor.rowcount > 0
+    
     async def delete_session(self, session_id: int) -> bool:
         """Delete a session."""
         async with self.connection() as conn:
@@ -158,6 +194,15 @@ class DatabaseService:
             )
             return cursor.rowcount
     
+    async def get_cookie_file_paths(self) -> List[str]:
+        """Get the cookie file paths referenced by any stored session."""
+        async with self.connection() as conn:
+            cursor = await conn.execute(
+                self._prepared_statements['get_cookie_file_paths']
+            )
+            rows = await cursor.fetchall()
+            return [row[0] for row in rows]
+    
     async def log_session_validation(self, session_id: int, 
                                    is_valid: bool, 
                                    error_message: Optional[str] = None):
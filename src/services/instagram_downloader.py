@@ -9,7 +9,7 @@ from datetime import datetime
 import subprocess
 from ..core.config import InstagramConfig
 from ..core.retry import RetryableOperation
-from ..core.resilience.smart_download import with_smart_download
+from ..core.resilience.smart_download import DownloadManagerDescriptor, with_smart_download
 from ..core.session_manager import InstagramSessionManager, InstagramSessionError
 
 logger = logging.getLogger(__name__)
@@ -29,6 +29,8 @@ class InstagramDownloader:
     Note: Stories and highlights are not supported as they require Instagram's private API access.
     """
     
+    _download_manager = DownloadManagerDescriptor()
+    
     def __init__(self, config: InstagramConfig):
         """
         Initialize the Instagram downloader with configuration.
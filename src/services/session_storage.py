@@ -1,13 +1,23 @@
 """Session storage service for managing Instagram sessions."""
+import contextlib
 import json
 import logging
+import secrets
 from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Dict, Any, List, Tuple
 from ..core.config import DatabaseConfig
 
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=1024)
+def _parse_iso(value: str) -> datetime:
+    """Parse an ISO-8601 timestamp; repeated values are served from cache."""
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    return datetime.fromisoformat(value)
+
 class SessionStorageError(Exception):
     """Exception raised for session storage errors."""
     pass
@@ -67,7 +77,7 @@ class SessionStorageService:
             return session_id
             
         except Exception as e:
-            logger.error(f"Failed to store session: {e}")
+            logger.error("Failed to store session: %s", e)
             raise SessionStorageError(f"Failed to store session: {str(e)}")
     
     def _store_cookie_file(self, user_id: int, source_path: Path) -> Path:
@@ -86,38 +96,31 @@ class SessionStorageService:
             
             # Create final path
             dest_path = user_path / "cookies.txt"
-            temp_path = user_path / f"temp_cookies_{int(datetime.now().timestamp())}.txt"
+            temp_path = user_path / f"temp_cookies_{secrets.token_hex(8)}.txt"
             
             try:
-                # First copy to temp file
-                with open(source_path, 'r', encoding='utf-8') as src, \
-                     open(temp_path, 'w', encoding='utf-8') as dst:
-                    content = src.read()
-                    if not any(domain in content for domain in ['.instagram.com', 'instagram.com']):
-                        raise SessionStorageError("No Instagram cookies found in file")
-                    dst.write(content)
+                # First copy to temp file, checking the raw bytes without decoding
+                content = source_path.read_bytes()
+                if b'instagram.com' not in content:
+                    raise SessionStorageError("No Instagram cookies found in file")
+                temp_path.write_bytes(content)
                 
-                # If copy successful, move to final location
-                if dest_path.exists():
-                    dest_path.unlink()
-                temp_path.rename(dest_path)
-                logger.info(f"Successfully stored cookie file for user {user_id}")
+                # If copy successful, move to final location (replaces any old file)
+                temp_path.replace(dest_path)
+                logger.info("Successfully stored cookie file for user %s", user_id)
                 
                 return dest_path
                 
             finally:
                 # Clean up temp file if it exists
-                if temp_path.exists():
-                    temp_path.unlink()
+                temp_path.unlink(missing_ok=True)
             
         except Exception as e:
-            logger.error(f"Failed to store cookie file: {e}")
+            logger.error("Failed to store cookie file: %s", e)
             # Clean up destination file if it exists after error
-            if 'dest_path' in locals() and dest_path.exists():
-                try:
-                    dest_path.unlink()
-                except Exception:
-                    pass
+            if 'dest_path' in locals():
+                with contextlib.suppress(OSError):
+                    dest_path.unlink(missing_ok=True)
             raise SessionStorageError(f"Failed to store cookie file: {str(e)}")
     
     async def get_active_session(self, user_id: int) -> Optional[Dict[str, Any]]:
@@ -128,15 +131,22 @@ class SessionStorageService:
                 try:
                     session['session_data'] = json.loads(session['session_data'])
                 except json.JSONDecodeError as e:
-                    logger.error(f"Failed to decode session data: {e}")
+                    logger.error("Failed to decode session data: %s", e)
                     session['session_data'] = {}
             return session
         except Exception as e:
-            logger.error(f"Failed to get active session: {e}")
+            logger.error("Failed to get active session: %s", e)
             raise SessionStorageError(f"Failed to get active session: {str(e)}")
     
+    @staticmethod
+    def _parse_timestamp(value: Any) -> Optional[datetime]:
+        """Convert a stored ISO timestamp to a datetime, passing other values through."""
+        if isinstance(value, str):
+            return _parse_iso(value)
+        return value
+
     async def get_all_sessions(self, user_id: int) -> List[Dict[str, Any]]:
-        """Get all sessions for a user."""
+        """Get all sessions for a user with timestamps parsed to datetimes."""
         try:
             sessions = await self.db.get_all_sessions(user_id)
             for session in sessions:
@@ -144,49 +154,32 @@ class SessionStorageService:
                     if isinstance(session['session_data'], str):
                         session['session_data'] = json.loads(session['session_data'])
                 except (json.JSONDecodeError, KeyError) as e:
-                    logger.error(f"Failed to decode session data: {e}")
+                    logger.error("Failed to decode session data: %s", e)
                     session['session_data'] = {}
+                session['expires_at'] = self._parse_timestamp(session.get('expires_at'))
+                session['last_validated'] = self._parse_timestamp(session.get('last_validated'))
             return sessions
         except Exception as e:
-            logger.error(f"Failed to get sessions: {e}")
+            logger.error("Failed to get sessions: %s", e)
             raise SessionStorageError(f"Failed to get sessions: {str(e)}")
     
     async def set_active_session(self, user_id: int, session_id: int) -> bool:
         """Set a session as active and deactivate others."""
         try:
-            # Get the session to make sure it exists and belongs to the user
-            sessions = await self.get_all_sessions(user_id)
-            target_session = next((s for s in sessions if s['id'] == session_id), None)
-            
-            if not target_session:
+            # One prepared UPDATE checks ownership and flips every flag for the user
+            if not await self.db.activate_user_session(user_id, session_id):
                 raise SessionStorageError("Session not found or doesn't belong to user")
-            
-            # Deactivate all other sessions
-            for session in sessions:
-                if session['id'] != session_id:
-                    await self.db.update_session(
-                        session['id'],
-                        session_data=json.dumps(session['session_data']),
-                        is_active=False
-                    )
-            
-            # Activate target session
-            return await self.db.update_session(
-                session_id,
-                session_data=json.dumps(target_session['session_data']),
-                is_active=True
-            )
+            return True
             
         except Exception as e:
-            logger.error(f"Failed to set active session: {e}")
+            logger.error("Failed to set active session: %s", e)
             raise SessionStorageError(f"Failed to set active session: {str(e)}")
     
     async def delete_session(self, user_id: int, session_id: int) -> bool:
         """Delete a session and its associated files."""
         try:
             # Get session to check ownership and get file path
-            sessions = await self.get_all_sessions(user_id)
-            session = next((s for s in sessions if s['id'] == session_id), None)
+            session = await self.db.get_user_session(user_id, session_id)
             
             if not session:
                 raise SessionStorageError("Session not found or doesn't belong to user")
@@ -195,61 +188,46 @@ class SessionStorageService:
             if session['cookies_file_path']:
                 try:
                     cookie_file = Path(session['cookies_file_path'])
-                    if cookie_file.exists():
+                    with contextlib.suppress(FileNotFoundError):
                         cookie_file.unlink()
-                        logger.info(f"Deleted cookie file for session {session_id}")
+                        logger.info("Deleted cookie file for session %s", session_id)
                     user_dir = cookie_file.parent
                     if user_dir.exists() and not any(user_dir.iterdir()):
                         user_dir.rmdir()
-                        logger.info(f"Removed empty user directory: {user_dir}")
+                        logger.info("Removed empty user directory: %s", user_dir)
                 except Exception as e:
-                    logger.warning(f"Failed to delete cookie file: {e}")
+                    logger.warning("Failed to delete cookie file: %s", e)
             
             # Delete from database
             success = await self.db.delete_session(session_id)
             if success:
-                logger.info(f"Successfully deleted session {session_id} for user {user_id}")
+                logger.info("Successfully deleted session %s for user %s", session_id, user_id)
             return success
             
         except Exception as e:
-            logger.error(f"Failed to delete session: {e}")
+            logger.error("Failed to delete session: %s", e)
             raise SessionStorageError(f"Failed to delete session: {str(e)}")
     
     async def cleanup_expired_sessions(self) -> int:
         """Clean up expired sessions and their files."""
         try:
-            # Get all sessions before cleanup to handle files
-            all_sessions = []
-            for user_path in self.sessions_path.iterdir():
-                if user_path.is_dir():
-                    try:
-                        user_id = int(user_path.name)
-                        sessions = await self.get_all_sessions(user_id)
-                        all_sessions.extend(sessions)
-                    except ValueError:
-                        continue
-            
-            # Delete expired sessions from database
+            # Delete expired sessions from database in a single statement
             deleted_count = await self.db.cleanup_expired_sessions()
             
-            # Clean up orphaned cookie files
-            self._cleanup_orphaned_files(all_sessions)
+            # Clean up cookie files no remaining session refers to
+            live_paths = await self.db.get_cookie_file_paths()
+            self._cleanup_orphaned_files(live_paths)
             
             return deleted_count
             
         except Exception as e:
-            logger.error(f"Failed to cleanup sessions: {e}")
+            logger.error("Failed to cleanup sessions: %s", e)
             raise SessionStorageError(f"Failed to cleanup sessions: {str(e)}")
     
-    def _cleanup_orphaned_files(self, active_sessions: List[Dict[str, Any]]):
-        """Clean up cookie files that don't belong to any active session."""
+    def _cleanup_orphaned_files(self, live_paths: List[str]):
+        """Clean up cookie files that don't belong to any stored session."""
         try:
-            # Get all cookie file paths from active sessions
-            active_paths = {
-                Path(s['cookies_file_path'])
-                for s in active_sessions
-                if s['cookies_file_path']
-            }
+            active_paths = {Path(p) for p in live_paths}
             
             # Check each user's session directory
             for user_path in self.sessions_path.iterdir():
@@ -261,17 +239,17 @@ class SessionStorageService:
                     if file_path not in active_paths:
                         try:
                             file_path.unlink()
-                            logger.info(f"Deleted orphaned cookie file: {file_path}")
+                            logger.info("Deleted orphaned cookie file: %s", file_path)
                         except Exception as e:
-                            logger.warning(f"Failed to delete orphaned file {file_path}: {e}")
+                            logger.warning("Failed to delete orphaned file %s: %s", file_path, e)
                 
                 # Remove empty user directories
                 if not any(user_path.iterdir()):
                     try:
                         user_path.rmdir()
-                        logger.info(f"Removed empty session directory: {user_path}")
+                        logger.info("Removed empty session directory: %s", user_path)
                     except Exception as e:
-                        logger.warning(f"Failed to remove empty directory {user_path}: {e}")
+                        logger.warning("Failed to remove empty directory %s: %s", user_path, e)
                         
         except Exception as e:
-            logger.error(f"Error cleaning up orphaned files: {e}")
\ No newline at end of file
+            logger.error("Error cleaning up orphaned files: %s", e)
\ No newline at end of file
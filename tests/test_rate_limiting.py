@@ -1,6 +1,7 @@
 """Tests for rate limiting and smart download functionality."""
 import pytest
 import asyncio
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
 from unittest.mock import Mock, patch
@@ -8,7 +9,7 @@ from unittest.mock import Mock, patch
 pytest_plugins = ('pytest_asyncio',)
 
 from src.core.resilience.rate_limiter import InstagramRateLimiter
-from src.core.resilience.smart_download import SmartDownloadManager, with_smart_download
+from src.core.resilience.smart_download import InstagramRateLimit, SmartDownloadManager, with_smart_download
 from src.services.instagram_downloader import InstagramDownloader
 
 # Constants for timing tests
@@ -86,9 +87,12 @@ async def test_smart_download_retry_logic(download_manager):
     assert mock_downloader.download_post.call_count == 3
 
 async def test_smart_download_backoff(download_manager):
-    """Test that smart download implements exponential backoff."""
-    start_time = asyncio.get_event_loop().time()
-    
+    """Test that smart download backs off with capped decorrelated jitter."""
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
     # Create a mock class instance
     class MockDownloader:
         def __init__(self):
@@ -99,15 +103,92 @@ async def test_smart_download_backoff(download_manager):
             raise Exception("Simulated failure")
     
     downloader = MockDownloader()
-    with pytest.raises(Exception):
-        try:
+    with patch('src.core.resilience.smart_download._sleep', new=fake_sleep):
+        with pytest.raises(Exception, match="Simulated failure"):
             await downloader.failing_download()
-        except Exception as e:
-            elapsed = asyncio.get_event_loop().time() - start_time
-            # Verify that enough time has passed for exponential backoff (allow timing variance)
-            delays = [download_manager._calculate_backoff(i) for i in range(3)]
-            assert elapsed >= sum(delays) * TIMING_TOLERANCE
-            raise e
+
+    # Three attempts leave two backoffs; the full bucket adds no pacing waits
+    assert len(delays) == 2
+
+    # Each wait is drawn from [initial, 3 * previous wait], capped at the max
+    IRL = InstagramRateLimit
+
+    def assert_decorrelated(sequence):
+        prev = IRL.backoff_initial
+        for delay in sequence:
+            assert IRL.backoff_initial <= delay <= min(IRL.backoff_max, 3 * prev)
+            prev = delay
+
+    assert_decorrelated(delays)
+    download_manager.reset_backoff()
+    assert_decorrelated([download_manager._calculate_backoff() for _ in range(50)])
+
+async def test_smart_download_concurrent_waiters_are_spaced(download_manager):
+    """Test that callers past the burst capacity queue one interval apart."""
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    extra = 7
+    callers = download_manager._capacity + extra
+    with patch('src.core.resilience.smart_download._sleep', new=fake_sleep), \
+         patch.object(download_manager, '_add_jitter', side_effect=lambda delay: delay):
+        await asyncio.gather(*(download_manager.wait_before_request() for _ in range(callers)))
+
+    # The burst goes straight through; each later caller waits one more interval
+    interval = InstagramRateLimit.min_request_interval
+    assert sorted(delays) == pytest.approx([interval * n for n in range(1, extra + 1)], rel=0.01)
+
+async def test_smart_download_batch_delay_with_full_bucket(download_manager):
+    """Test that batch requests wait at least batch_delay even with tokens available."""
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    with patch('src.core.resilience.smart_download._sleep', new=fake_sleep), \
+         patch.object(download_manager, '_add_jitter', side_effect=lambda delay: delay):
+        await download_manager.wait_before_request(is_batch=True)
+
+    assert delays == pytest.approx([InstagramRateLimit.batch_delay], rel=0.01)
+
+
+async def test_smart_download_conservative_mode_with_full_bucket(download_manager):
+    """Test that conservative mode spaces requests at twice the interval without a burst."""
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    download_manager.in_conservative_mode = True
+    with patch('src.core.resilience.smart_download._sleep', new=fake_sleep), \
+         patch.object(download_manager, '_add_jitter', side_effect=lambda delay: delay):
+        for _ in range(3):
+            await download_manager.wait_before_request()
+
+    # The first request goes straight out, the rest queue at double spacing
+    interval = 2 * InstagramRateLimit.min_request_interval
+    assert delays == pytest.approx([interval, 2 * interval], rel=0.01)
+
+
+async def test_smart_download_hourly_cap(download_manager):
+    """Test that a full hourly window holds requests until its oldest entry expires."""
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    # A full window whose oldest requests started half an hour ago, one second apart
+    now = time.monotonic()
+    cap = InstagramRateLimit.requests_per_hour
+    download_manager._request_history.extend(now - 1800.0 + i for i in range(cap))
+
+    with patch('src.core.resilience.smart_download._sleep', new=fake_sleep):
+        await download_manager.wait_before_request()
+        await download_manager.wait_before_request()
+
+    assert delays == pytest.approx([1800.0, 1801.0], abs=0.5)
 
 async def test_rate_limiter_overload(rate_limiter):
     """Test rate limiter behavior under overload conditions."""
@@ -0,0 +1,139 @@
+"""Tests for session list rendering and session button routing."""
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, Mock
+
+from src.core.session_commands import SessionCommands
+
+# Mark all tests in this module as asyncio tests
+pytestmark = pytest.mark.asyncio
+
+PER_PAGE = SessionCommands.SESSIONS_PER_PAGE
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096
+
+
+def make_sessions(count, active_id=None):
+    """Build stored-session rows as returned by SessionStorageService.get_all_sessions."""
+    return [
+        {
+            'id': sid,
+            'is_active': sid == active_id,
+            'session_type': 'cookies_file',
+            'expires_at': None,
+            'last_validated': None,
+        }
+        for sid in range(1, count + 1)
+    ]
+
+
+def callback_data(markup):
+    """Flatten a keyboard into rows of callback data."""
+    return [[button.callback_data for button in row] for row in markup.inline_keyboard]
+
+
+@pytest.fixture
+def commands():
+    return SessionCommands(session_manager=Mock(), services=Mock())
+
+
+@pytest.fixture
+def callback_update():
+    update = Mock()
+    update.effective_user.id = 42
+    update.callback_query = Mock(answer=AsyncMock(), edit_message_text=AsyncMock())
+    return update
+
+
+async def test_render_single_page_has_no_navigation(commands):
+    """Test that a short list renders on one page without Prev/Next buttons."""
+    text, markup = commands._render_session_page(make_sessions(3, active_id=1), 0)
+
+    assert "Page" not in text
+    # The active session only gets a delete button
+    assert callback_data(markup) == [
+        ["delete_session_1"],
+        ["activate_session_2"], ["delete_session_2"],
+        ["activate_session_3"], ["delete_session_3"],
+    ]
+
+
+async def test_render_page_is_clamped(commands):
+    """Test that out-of-range pages are clamped to the first and last page."""
+    sessions = make_sessions(2 * PER_PAGE + 5)
+
+    text, markup = commands._render_session_page(sessions, 99)
+    assert "Page 3/3" in text
+    assert callback_data(markup)[-1] == ["session_page_1"]
+    assert f"activate_session_{2 * PER_PAGE + 1}" in callback_data(markup)[0]
+
+    text, markup = commands._render_session_page(sessions, -5)
+    assert "Page 1/3" in text
+    assert callback_data(markup)[-1] == ["session_page_1"]
+    assert callback_data(markup)[0] == ["activate_session_1"]
+
+
+async def test_render_middle_page_row_limit(commands):
+    """Test that a full page has at most two rows per session plus navigation."""
+    text, markup = commands._render_session_page(make_sessions(3 * PER_PAGE), 1)
+
+    rows = callback_data(markup)
+    assert "Page 2/3" in text
+    assert len(rows) == 2 * PER_PAGE + 1
+    assert rows[-1] == ["session_page_0", "session_page_2"]
+
+
+async def test_render_full_page_fits_in_one_message(commands):
+    """Test that a full page with long status lines stays within Telegram's limit."""
+    now = datetime.now()
+    sessions = [
+        {
+            'id': 100000 + n,
+            'is_active': False,
+            'session_type': 'cookies_file',
+            'expires_at': now + timedelta(days=36500),
+            'last_validated': now - timedelta(days=36500),
+        }
+        for n in range(3 * PER_PAGE)
+    ]
+
+    text, _ = commands._render_session_page(sessions, 1)
+
+    # Telegram counts UTF-16 code units
+    assert len(text.encode('utf-16-le')) // 2 <= TELEGRAM_MAX_MESSAGE_LENGTH
+
+
+async def test_session_page_button_edits_message(commands, callback_update):
+    """Test that session_page_<n> callbacks render the requested page in place."""
+    commands._fetch_session_list = AsyncMock(
+        return_value=({'healthy': True}, make_sessions(3 * PER_PAGE), {})
+    )
+    callback_update.callback_query.data = "session_page_2"
+
+    await commands.handle_session_button(callback_update, Mock())
+
+    commands._fetch_session_list.assert_awaited_once_with(42)
+    text = callback_update.callback_query.edit_message_text.await_args.args[0]
+    assert "Page 3/3" in text
+
+
+async def test_callback_without_data_is_ignored(commands, callback_update):
+    """Test that callbacks with no data fall through without raising."""
+    callback_update.callback_query.data = None
+
+    await commands.handle_session_button(callback_update, Mock())
+
+    callback_update.callback_query.edit_message_text.assert_not_awaited()
+
+
+async def test_session_page_reports_unhealthy_storage(commands, callback_update):
+    """Test that paging with broken storage shows the storage warning."""
+    commands._fetch_session_list = AsyncMock(
+        return_value=({'healthy': False, 'issues': ['database locked']}, [], {})
+    )
+    callback_update.callback_query.data = "session_page_1"
+
+    await commands.handle_session_button(callback_update, Mock())
+
+    text = callback_update.callback_query.edit_message_text.await_args.args[0]
+    assert "Session storage issues detected" in text
+    assert "database locked" in text
@@ -0,0 +1,107 @@
+"""Tests for cookies.txt parsing and session probes in the Instagram session manager."""
+import pytest
+from unittest.mock import Mock
+
+from src.core.session_manager import InstagramSessionManager
+
+COOKIES_TXT = (
+    "# Netscape HTTP Cookie File\n"
+    "#HttpOnly_.instagram.com\tTRUE\t/\tTRUE\t1999999999\tsessionid\tabc123\n"
+    ".instagram.com\tTRUE\t/\tTRUE\t1999999999\tcsrftoken\ttoken456\n"
+    "# .instagram.com\tTRUE\t/\tTRUE\t1999999999\tcommented\tout\n"
+    ".example.com\tTRUE\t/\tFALSE\t0\tother\tvalue\n"
+)
+
+
+def test_extract_session_cookies_keeps_httponly_lines(tmp_path):
+    """Test that #HttpOnly_-prefixed cookies are parsed while comments are skipped."""
+    cookies_file = tmp_path / "cookies.txt"
+    cookies_file.write_text(COOKIES_TXT)
+
+    cookies = InstagramSessionManager._extract_session_cookies(cookies_file)
+
+    assert cookies == {'sessionid': 'abc123', 'csrftoken': 'token456'}
+
+
+def test_httponly_session_cookie_loads_session(tmp_path):
+    """Test that a browser export with an HttpOnly sessionid passes validation."""
+    cookies_file = tmp_path / "cookies.txt"
+    cookies_file.write_text(COOKIES_TXT)
+
+    manager = InstagramSessionManager(tmp_path, cookies_file)
+
+    assert manager.check_session()
+
+
+@pytest.mark.asyncio
+async def test_load_cookies_copies_caller_file(tmp_path):
+    """Test that an imported file the caller keeps is copied, not linked."""
+    source = tmp_path / "export.txt"
+    source.write_text(COOKIES_TXT)
+    manager = InstagramSessionManager(tmp_path, tmp_path / "session" / "cookies.txt")
+
+    await manager.load_cookies_from_file(source)
+    source.write_text("overwritten")
+
+    assert manager.cookies_file.read_text() == COOKIES_TXT
+
+
+@pytest.mark.asyncio
+async def test_load_cookies_links_owned_source(tmp_path):
+    """Test that a throwaway source owned by the caller is hard-linked into place."""
+    source = tmp_path / "upload.txt"
+    source.write_text(COOKIES_TXT)
+    manager = InstagramSessionManager(tmp_path, tmp_path / "session" / "cookies.txt")
+
+    await manager.load_cookies_from_file(source, owns_source=True)
+
+    assert manager.cookies_file.samefile(source)
+
+
+def probe_response(content_type, body):
+    """Build a 200 response stub for the shared_data probe."""
+    return Mock(status_code=200, headers={'Content-Type': content_type}, content=body)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    cookies_file = tmp_path / "cookies.txt"
+    cookies_file.write_text(COOKIES_TXT)
+    return InstagramSessionManager(tmp_path, cookies_file)
+
+
+@pytest.mark.asyncio
+async def test_session_probe_accepts_json_config(manager):
+    """Test that a JSON shared_data payload with a config key is a valid session."""
+    manager.http = Mock(get=Mock(return_value=probe_response(
+        'application/json; charset=utf-8', b'{"config": {"viewer": {}}}'
+    )))
+
+    valid, _ = await manager._test_session(max_retries=0)
+
+    assert valid
+
+
+@pytest.mark.asyncio
+async def test_session_probe_rejects_html_login_page(manager):
+    """Test that a 200 HTML login page embedding "config" is not a valid session."""
+    manager.http = Mock(get=Mock(return_value=probe_response(
+        'text/html; charset=utf-8',
+        b'<script>window._sharedData = {"config": {"viewer": null}};</script>'
+    )))
+
+    valid, _ = await manager._test_session(max_retries=0)
+
+    assert not valid
+
+
+@pytest.mark.asyncio
+async def test_session_probe_rejects_nested_config(manager):
+    """Test that a JSON body with "config" only below the top level is not a valid session."""
+    manager.http = Mock(get=Mock(return_value=probe_response(
+        'application/json', b'{"status": "fail", "details": {"config": {}}}'
+    )))
+
+    valid, _ = await manager._test_session(max_retries=0)
+
+    assert not valid
@@ -0,0 +1,94 @@
+"""Tests for per-user session ownership in session storage."""
+import contextlib
+import sqlite3
+
+import aiosqlite
+import pytest
+import pytest_asyncio
+
+from src.services.database_session import DatabaseService
+from src.services.session_storage import SessionStorageError, SessionStorageService
+
+# Mark all tests in this module as asyncio tests
+pytestmark = pytest.mark.asyncio
+
+OWNER, OTHER = 1, 2
+
+
+class SqliteSessionDB(DatabaseService):
+    """Session database backed by a SQLite file with the real migration applied."""
+
+    def __init__(self, path):
+        self._path = path
+        self._prepared_statements = {}
+
+    @contextlib.asynccontextmanager
+    async def connection(self):
+        async with aiosqlite.connect(self._path) as conn:
+            yield conn
+            await conn.commit()
+
+
+@pytest_asyncio.fixture
+async def db(tmp_path):
+    database = SqliteSessionDB(tmp_path / "sessions.db")
+    with contextlib.closing(sqlite3.connect(database._path)) as conn:
+        await database._create_tables(conn)
+    return database
+
+
+@pytest.fixture
+def storage(db, tmp_path):
+    return SessionStorageService(db, tmp_path / "downloads")
+
+
+async def add_session(db, user_id, name, active):
+    return await db.store_instagram_session(
+        user_id, "user", "cookies_file", "{}",
+        cookies_file_path=f"/sessions/{user_id}/{name}.txt",
+        make_active=active
+    )
+
+
+async def active_flags(db, user_id):
+    return {s['id']: s['is_active'] for s in await db.get_all_sessions(user_id)}
+
+
+async def test_activate_deactivates_users_other_sessions(db, storage):
+    """Test that activating a session leaves it as the user's only active one."""
+    first = await add_session(db, OWNER, "a", active=True)
+    second = await add_session(db, OWNER, "b", active=False)
+
+    assert await storage.set_active_session(OWNER, second)
+    assert await active_flags(db, OWNER) == {first: False, second: True}
+
+
+async def test_activate_leaves_other_users_untouched(db, storage):
+    """Test that activating a session does not change another user's sessions."""
+    theirs = await add_session(db, OTHER, "a", active=True)
+    mine = await add_session(db, OWNER, "a", active=False)
+
+    await storage.set_active_session(OWNER, mine)
+    assert await active_flags(db, OTHER) == {theirs: True}
+
+
+async def test_activate_foreign_session_is_rejected(db, storage):
+    """Test that a user cannot activate a session owned by someone else."""
+    mine = await add_session(db, OWNER, "a", active=True)
+    theirs = await add_session(db, OTHER, "a", active=False)
+
+    assert not await db.activate_user_session(OWNER, theirs)
+    with pytest.raises(SessionStorageError):
+        await storage.set_active_session(OWNER, theirs)
+
+    # Neither user's flags changed
+    assert await active_flags(db, OWNER) == {mine: True}
+    assert await active_flags(db, OTHER) == {theirs: False}
+
+
+async def test_get_user_session_checks_ownership(db):
+    """Test that get_user_session only returns the caller's own sessions."""
+    theirs = await add_session(db, OTHER, "a", active=True)
+
+    assert await db.get_user_session(OWNER, theirs) is None
+    assert (await db.get_user_session(OTHER, theirs))['id'] == theirs